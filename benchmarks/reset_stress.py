@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Reset stress test
+
+Runs 100k level resets, each after a few moves that turn tiles red, and checks
+that memory stays flat and that reset time does not grow with the run.
+
+Run from the repository root:
+    python benchmarks/reset_stress.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.constants import *
+from src.game_state import GameState
+from src.player import Player
+
+RESETS = 100_000
+BATCH = 10_000
+MAX_MEMORY_GROWTH = 64 * 1024  # bytes between the first and last batch
+MAX_SLOWDOWN = 1.5             # last batch vs first batch reset time
+
+def main():
+    game_state = GameState(campaign_seed=1, use_level_files=False)
+    # Find a TILES_TURN_RED level so every reset has tiles to restore
+    while not game_state.tiles_turn_red:
+        game_state.level += 1
+        game_state.generate_level()
+    player = Player()
+    moves = [(1, 0), (0, 1), (1, 0), (0, 1)]
+    
+    tracemalloc.start()
+    batch_times = []
+    batch_memory = []
+    reset_time = 0.0
+    
+    for i in range(1, RESETS + 1):
+        for dx, dy in moves:
+            x, y = player.position[0] + dx, player.position[1] + dy
+            if game_state.grid[y][x] != TILE_RED:
+                player.move(dx, dy, game_state)
+        
+        start = time.perf_counter()
+        game_state.reset_level()
+        player.reset()
+        reset_time += time.perf_counter() - start
+        
+        if i % BATCH == 0:
+            batch_times.append(reset_time / BATCH * 1e6)
+            batch_memory.append(tracemalloc.get_traced_memory()[0])
+            print(f"{i:>7} resets: {batch_times[-1]:6.2f} us/reset, {batch_memory[-1] / 1024:8.1f} KiB traced")
+            reset_time = 0.0
+    
+    tracemalloc.stop()
+    
+    growth = batch_memory[-1] - batch_memory[0]
+    slowdown = batch_times[-1] / batch_times[0]
+    print(f"memory growth {growth / 1024:.1f} KiB, last/first batch time {slowdown:.2f}x")
+    
+    if growth > MAX_MEMORY_GROWTH or slowdown > MAX_SLOWDOWN:
+        print("FAIL: resets are not flat")
+        return 1
+    print("OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import numpy as np
+from typing import Dict, List
+from .constants import *
+from .enums import RULES
+
+
+class BatchGenerator:
+    """Generates many levels at once as NumPy arrays for batch simulation and level corpora
+    
+    Each level gets a random key per cell; sorting the keys gives a random order of the
+    cells, and the first walls + teleporters + boosts + red tiles cells in that order get
+    those tiles. Counts are drawn per level within the same MIN_/MAX_ limits as
+    LevelGenerator, but cells are never drawn twice, so every level gets its full count.
+    """
+    
+    def __init__(self, seed: int = None, player_pos: List[int] = None, chunk_size: int = 16384):
+        self.rng = np.random.default_rng(seed)
+        self.player_pos = list(player_pos) if player_pos is not None else [0, 0]
+        self.chunk_size = chunk_size
+        
+        cells = TILE_WIDTH * TILE_HEIGHT
+        self.player_cell = self.player_pos[1] * TILE_WIDTH + self.player_pos[0]
+        self.rank = np.arange(cells, dtype=np.int16)
+        self.max_pairs = MAX_TELEPORTERS // 2
+        
+        # Cells in the bottom-right area where the door is placed when possible
+        ys, xs = np.divmod(np.arange(cells), TILE_WIDTH)
+        self.door_area = (xs >= DOOR_MIN_COORD) & (ys >= DOOR_MIN_COORD)
+        self.door_area[self.player_cell] = False
+    
+    def generate(self, count: int) -> Dict[str, np.ndarray]:
+        """Generate count levels
+        
+        Returns a dict of arrays: grids (N, H, W) uint8 tile types, door_pos (N, 2),
+        teleporters (N, MAX_TELEPORTERS // 2, 2, 2) with unused pairs set to -1, and
+        rules (N,) indexes into RULES.
+        """
+        batch = {
+            'grids': np.empty((count, TILE_HEIGHT, TILE_WIDTH), dtype=np.uint8),
+            'door_pos': np.empty((count, 2), dtype=np.int8),
+            'teleporters': np.full((count, self.max_pairs, 2, 2), -1, dtype=np.int8),
+            'rules': self.rng.integers(0, len(RULES), count, dtype=np.uint8)
+        }
+        for start in range(0, count, self.chunk_size):
+            end = min(count, start + self.chunk_size)
+            self._generate_chunk(batch, start, end)
+        return batch
+    
+    def _generate_chunk(self, batch: Dict[str, np.ndarray], start: int, end: int):
+        """Fill levels start..end of a batch"""
+        count = end - start
+        cells = TILE_WIDTH * TILE_HEIGHT
+        rng = self.rng
+        
+        walls = rng.integers(MIN_WALLS, MAX_WALLS + 1, count, dtype=np.int16)[:, None]
+        # Teleporter tiles are drawn like LevelGenerator does, then rounded down to whole pairs
+        pairs = rng.integers(MIN_TELEPORTERS, MAX_TELEPORTERS + 1, count, dtype=np.int16)[:, None] // 2
+        boosts = rng.integers(MIN_SPEED_BOOSTS, MAX_SPEED_BOOSTS + 1, count, dtype=np.int16)[:, None]
+        reds = rng.integers(MIN_RED_TILES, MAX_RED_TILES + 1, count, dtype=np.int16)[:, None]
+        
+        # A random order of the cells per level; the player's cell always sorts last
+        keys = rng.random((count, cells), dtype=np.float32)
+        keys[:, self.player_cell] = 2.0
+        order = np.argsort(keys, axis=1)
+        
+        # Tile type by rank in that order, then scattered back onto the cells
+        teleporters_end = walls + 2 * pairs
+        boosts_end = teleporters_end + boosts
+        reds_end = boosts_end + reds
+        tiles_by_rank = np.full((count, cells), TILE_EMPTY, dtype=np.uint8)
+        tiles_by_rank[self.rank < reds_end] = TILE_RED
+        tiles_by_rank[self.rank < boosts_end] = TILE_SPEED_BOOST
+        tiles_by_rank[self.rank < teleporters_end] = TILE_TELEPORTER
+        tiles_by_rank[self.rank < walls] = TILE_WALL
+        grids = batch['grids'][start:end].reshape(count, cells)
+        np.put_along_axis(grids, order, tiles_by_rank, axis=1)
+        
+        # Consecutive teleporter ranks form the pairs
+        pair_ranks = np.minimum(walls + np.arange(2 * self.max_pairs), cells - 1)
+        pair_cells = np.take_along_axis(order, pair_ranks, axis=1).reshape(count, self.max_pairs, 2)
+        used = np.arange(self.max_pairs) < pairs
+        ys, xs = np.divmod(pair_cells, TILE_WIDTH)
+        teleporters = batch['teleporters'][start:end]
+        teleporters[..., 0] = np.where(used[:, :, None], xs, -1)
+        teleporters[..., 1] = np.where(used[:, :, None], ys, -1)
+        
+        # Empty cells' keys are still independent, so the smallest picks one at random
+        empty = grids == TILE_EMPTY
+        empty[:, self.player_cell] = False
+        in_area = np.where(empty & self.door_area, keys, np.inf)
+        anywhere = np.where(empty, keys, np.inf)
+        door = np.where(
+            np.isfinite(in_area.min(axis=1)),
+            in_area.argmin(axis=1),
+            anywhere.argmin(axis=1)
+        )
+        batch['door_pos'][start:end, 0] = door % TILE_WIDTH
+        batch['door_pos'][start:end, 1] = door // TILE_WIDTH
+    
+    def to_level_data(self, batch: Dict[str, np.ndarray], index: int) -> Dict:
+        """Convert one level of a batch to the level dict used by GameState and LevelLoader"""
+        grid = batch['grids'][index].tolist()
+        positions = {tile_type: [] for tile_type in (TILE_WALL, TILE_SPEED_BOOST, TILE_RED)}
+        for y, row in enumerate(grid):
+            for x, tile_type in enumerate(row):
+                if tile_type in positions:
+                    positions[tile_type].append([x, y])
+        
+        return {
+            'grid': grid,
+            'teleporters': [pair for pair in batch['teleporters'][index].tolist() if pair[0][0] >= 0],
+            'speed_boosts': positions[TILE_SPEED_BOOST],
+            'red_tiles': positions[TILE_RED],
+            'walls': positions[TILE_WALL],
+            'player_pos': list(self.player_pos),
+            'door_pos': batch['door_pos'][index].tolist(),
+            'current_rule': RULES[batch['rules'][index]]
+        }
+    
+    @staticmethod
+    def save(batch: Dict[str, np.ndarray], path: str):
+        """Write a batch to a compressed .npz corpus file"""
+        try:
+            np.savez_compressed(path, **batch)
+        except OSError as e:
+            print(f"Error saving level batch: {e}")
+    
+    @staticmethod
+    def load(path: str) -> Dict[str, np.ndarray]:
+        """Read a batch written by save"""
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
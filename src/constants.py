@@ -32,8 +32,68 @@ CYAN = (0, 255, 255)
 # Game Settings
 MAX_MOVES = 100  
 FPS = 60
+SIMULATION_HZ = 240
+THREADED_RENDERING = True
 MAX_LEVELS = 12  
 
+# Input Latency
+INPUT_LATENCY_BUDGET_MS = 50
+LATENCY_SAMPLE_SIZE = 1000
+
+# Hint Search
+HINT_TIME_BUDGET_MS = 20
+HINT_CACHE_SIZE = 256
+HINT_MAX_BEAM_WIDTH = 256
+
+# Bot Tournament
+EPISODE_MAX_STEPS = 1000
+
+# Save Game
+SAVE_FILE = "savegame.dat"
+TILE_BITS = 3
+
+# Telemetry
+TELEMETRY_ENABLED = True
+TELEMETRY_FILE = "telemetry.ndjson"
+TELEMETRY_MAX_BYTES = 5 * 1024 * 1024
+TELEMETRY_BACKUPS = 3
+TELEMETRY_FLUSH_INTERVAL_S = 0.5
+
+# Spectator Broadcast
+SPECTATOR_ENABLED = False
+SPECTATOR_HOST = "127.0.0.1"
+SPECTATOR_PORT = 7777
+SPECTATOR_KEYFRAME_INTERVAL = 100
+SPECTATOR_SEND_TIMEOUT_S = 0.5
+
+# Tracing
+TRACE_FILE = "trace.json"
+TRACE_SAMPLE_EVERY = 10
+
+# Level Hashing
+ZOBRIST_SEED = 0x7472_6975_6D
+LEVEL_INDEX_FILE = "level_index.dat"
+
+# Heatmap
+HEATMAP_FILE = "heatmap.npz"
+HEATMAP_BATCH_SIZE = 65536
+HEATMAP_MAX_ALPHA = 160
+
+# Run History
+RUN_HISTORY_ENABLED = True
+RUN_HISTORY_FILE = "history.db"
+RUN_HISTORY_BATCH_SIZE = 256
+RUN_HISTORY_FLUSH_INTERVAL_S = 0.5
+RUN_HISTORY_LEADERBOARD_SIZE = 5
+
+# Level Designer
+DESIGNER_TARGET_MIN = 25
+DESIGNER_TARGET_MAX = 30
+DESIGNER_MAX_MUTATIONS = 20000
+DESIGNER_MAX_OBSTACLES = 45
+DESIGNER_START_TEMPERATURE = 2.0
+DESIGNER_OUTPUT_DIR = "designed_levels"
+
 # Tile Types 
 TILE_EMPTY = 0
 TILE_WALL = 1
@@ -41,6 +101,7 @@ TILE_TELEPORTER = 2
 TILE_SPEED_BOOST = 3
 TILE_RED = 4
 TILE_DOOR = 5
+TILE_TYPES = TILE_DOOR + 1
 
 # Sprite Types
 SPRITE_PLAYER = "player"
@@ -0,0 +1,272 @@
+import heapq
+from typing import Iterable, List, Optional, Tuple
+from .constants import *
+
+UNREACHABLE = float('inf')
+
+class DistanceField:
+    """Shortest number of moves from every cell to the door, kept up to date incrementally
+    
+    Edges follow Player.move: walls and the grid edge block a move, red tiles cannot be
+    entered, teleporters jump to their partner and speed boosts carry the player one
+    extra tile when that tile is free. Distances count key presses, or with game_moves
+    the game's move counter, in which a boost carry costs two moves.
+    """
+    
+    DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    
+    def __init__(self, grid: List[List[int]], teleporters: List, door_pos: List[int],
+                 no_left_movement: bool = False, game_moves: bool = False):
+        self.height = len(grid)
+        self.width = len(grid[0]) if grid else 0
+        self.tiles = [tile for row in grid for tile in row]
+        self.no_left_movement = no_left_movement
+        self.boost_cost = 2 if game_moves else 1
+        
+        self.partner = {}
+        for first, second in teleporters:
+            a = self._index(first[0], first[1])
+            b = self._index(second[0], second[1])
+            self.partner[a] = b
+            self.partner[b] = a
+        
+        # succ[u] holds (direction, landing cell, cost); preds[v] maps u to the cheapest edge u -> v
+        self.succ = [[] for _ in self.tiles]
+        self.preds = [{} for _ in self.tiles]
+        for cell in range(len(self.tiles)):
+            self._set_edges(cell, self._compute_edges(cell))
+        
+        self.door = self._index(door_pos[0], door_pos[1])
+        self.dist = self._full_search(self.door)
+        
+        # Fields for other door positions stay valid until a tile changes
+        self.cached_fields = {self.door: self.dist}
+    
+    def distance(self, x: int, y: int) -> Optional[int]:
+        """Get the number of moves from a cell to the door, or None if unreachable"""
+        d = self.dist[self._index(x, y)]
+        return None if d == UNREACHABLE else d
+    
+    def best_move(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Get the move direction that gets closest to the door from a cell"""
+        best = None
+        best_dist = UNREACHABLE
+        for direction, landing, cost in self.succ[self._index(x, y)]:
+            if self.dist[landing] + cost < best_dist:
+                best = direction
+                best_dist = self.dist[landing] + cost
+        return best
+    
+    def set_door(self, door_pos: List[int]):
+        """Point the field at a new door position"""
+        door = self._index(door_pos[0], door_pos[1])
+        if door == self.door:
+            return
+        
+        self.door = door
+        if door not in self.cached_fields:
+            self.cached_fields[door] = self._full_search(door)
+        self.dist = self.cached_fields[door]
+    
+    def set_tile(self, x: int, y: int, tile_type: int):
+        """Change one tile and repair the distances it affects"""
+        self.set_tiles(((x, y, tile_type),))
+    
+    def set_tiles(self, changes: Iterable[Tuple[int, int, int]]):
+        """Change several (x, y, tile_type) tiles and repair the distances in one pass"""
+        changed = []
+        for x, y, tile_type in changes:
+            cell = self._index(x, y)
+            old_type = self.tiles[cell]
+            if old_type == tile_type:
+                continue
+            
+            changed.append(cell)
+            if old_type == TILE_TELEPORTER and cell in self.partner:
+                # The partner is left unpaired and no longer teleports anywhere
+                other = self.partner.pop(cell)
+                self.partner.pop(other, None)
+                changed.append(other)
+            self.tiles[cell] = tile_type
+        
+        if changed:
+            self._update_cells(changed)
+    
+    def move_teleporter(self, from_pos: List[int], to_pos: List[int], teleporters: Optional[List] = None):
+        """Move a teleporter onto an empty cell and repair the distances in one pass
+        
+        The moved tile keeps its partner, unless teleporters gives the new pairing of
+        every teleporter tile; only cells whose partner changed are re-examined.
+        """
+        source = self._index(from_pos[0], from_pos[1])
+        target = self._index(to_pos[0], to_pos[1])
+        self.tiles[source] = TILE_EMPTY
+        self.tiles[target] = TILE_TELEPORTER
+        
+        partner = dict(self.partner)
+        if teleporters is None:
+            other = partner.pop(source, None)
+            if other is not None:
+                partner[other] = target
+                partner[target] = other
+        else:
+            partner = {}
+            for first, second in teleporters:
+                a = self._index(first[0], first[1])
+                b = self._index(second[0], second[1])
+                partner[a] = b
+                partner[b] = a
+        
+        # Moves into a re-paired cell land somewhere else now
+        changed = {source, target}
+        changed.update(cell for cell in partner.keys() | self.partner.keys()
+                       if partner.get(cell) != self.partner.get(cell))
+        self.partner = partner
+        self._update_cells(list(changed))
+    
+    def _update_cells(self, changed: List[int]):
+        """Recompute the edges around changed cells and repair the field"""
+        # Fields for other doors would need the same repair, so drop them
+        self.cached_fields = {self.door: self.dist}
+        
+        # Only moves that enter a changed cell, or are carried into it by a boost, can change
+        sources = set()
+        for cell in changed:
+            sources.add(cell)
+            x, y = cell % self.width, cell // self.width
+            for dx, dy in self.DIRECTIONS:
+                sx, sy = x - dx, y - dy
+                if not (0 <= sx < self.width and 0 <= sy < self.height):
+                    continue
+                sources.add(sy * self.width + sx)
+                
+                # A boost one step back can carry a move from two steps back into the cell
+                if self.tiles[sy * self.width + sx] == TILE_SPEED_BOOST:
+                    bx, by = sx - dx, sy - dy
+                    if 0 <= bx < self.width and 0 <= by < self.height:
+                        sources.add(by * self.width + bx)
+        
+        lost = []
+        gained = []
+        for source in sources:
+            old_edges = self.succ[source]
+            new_edges = self._compute_edges(source)
+            if new_edges == old_edges:
+                continue
+            old_targets = {(landing, cost) for _, landing, cost in old_edges}
+            new_targets = {(landing, cost) for _, landing, cost in new_edges}
+            self._set_edges(source, new_edges)
+            if old_targets - new_targets:
+                lost.append(source)
+            if new_targets - old_targets:
+                gained.append(source)
+        
+        if lost or gained:
+            self._repair(lost, gained)
+    
+    def _repair(self, lost: List[int], gained: List[int]):
+        """Dynamic shortest-path repair after edges were removed from lost and added to gained"""
+        dist = self.dist
+        
+        # Find cells whose every shortest path used a removed edge, nearest first
+        affected = set()
+        heap = [(dist[cell], cell) for cell in lost if dist[cell] != UNREACHABLE]
+        heapq.heapify(heap)
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if cell in affected or cell == self.door or d != dist[cell]:
+                continue
+            supported = any(
+                dist[landing] + cost == d and landing not in affected
+                for _, landing, cost in self.succ[cell]
+            )
+            if supported:
+                continue
+            affected.add(cell)
+            for pred, cost in self.preds[cell].items():
+                if dist[pred] == d + cost:
+                    heapq.heappush(heap, (dist[pred], pred))
+        
+        for cell in affected:
+            dist[cell] = UNREACHABLE
+        
+        # Re-seed affected and newly connected cells from their neighbours, then relax backwards
+        heap = []
+        for cell in affected.union(gained):
+            best = min((dist[landing] + cost for _, landing, cost in self.succ[cell]), default=UNREACHABLE)
+            if best < dist[cell]:
+                dist[cell] = best
+                heap.append((best, cell))
+        heapq.heapify(heap)
+        
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if d != dist[cell]:
+                continue
+            for pred, cost in self.preds[cell].items():
+                if d + cost < dist[pred]:
+                    dist[pred] = d + cost
+                    heapq.heappush(heap, (d + cost, pred))
+    
+    def _full_search(self, door: int) -> List:
+        """Compute distances to a door from scratch by walking edges backwards, nearest first"""
+        dist = [UNREACHABLE] * len(self.tiles)
+        dist[door] = 0
+        heap = [(0, door)]
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if d != dist[cell]:
+                continue
+            for pred, cost in self.preds[cell].items():
+                if d + cost < dist[pred]:
+                    dist[pred] = d + cost
+                    heapq.heappush(heap, (d + cost, pred))
+        return dist
+    
+    def _compute_edges(self, cell: int) -> List[Tuple[Tuple[int, int], int, int]]:
+        """Get the (direction, landing cell, cost) of every legal move out of a cell"""
+        edges = []
+        if self.tiles[cell] == TILE_WALL:
+            return edges
+        
+        x, y = cell % self.width, cell // self.width
+        for dx, dy in self.DIRECTIONS:
+            if self.no_left_movement and dx < 0:
+                continue
+            
+            tx, ty = x + dx, y + dy
+            if not (0 <= tx < self.width and 0 <= ty < self.height):
+                continue
+            target = ty * self.width + tx
+            tile_type = self.tiles[target]
+            if tile_type == TILE_WALL or tile_type == TILE_RED:
+                continue
+            
+            landing = target
+            cost = 1
+            if tile_type == TILE_TELEPORTER:
+                landing = self.partner.get(target, target)
+            elif tile_type == TILE_SPEED_BOOST:
+                bx, by = tx + dx, ty + dy
+                if 0 <= bx < self.width and 0 <= by < self.height:
+                    boost_target = by * self.width + bx
+                    if self.tiles[boost_target] != TILE_WALL and self.tiles[boost_target] != TILE_RED:
+                        landing = boost_target
+                        cost = self.boost_cost
+            
+            if landing != cell:
+                edges.append(((dx, dy), landing, cost))
+        return edges
+    
+    def _set_edges(self, cell: int, edges: List[Tuple[Tuple[int, int], int, int]]):
+        """Replace a cell's outgoing edges, keeping the predecessor costs in step"""
+        for _, landing, _ in self.succ[cell]:
+            self.preds[landing].pop(cell, None)
+        
+        self.succ[cell] = edges
+        for _, landing, cost in edges:
+            self.preds[landing][cell] = min(cost, self.preds[landing].get(cell, cost))
+    
+    def _index(self, x: int, y: int) -> int:
+        """Get the flat index of a cell"""
+        return y * self.width + x
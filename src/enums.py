@@ -5,4 +5,8 @@ class RuleType(Enum):
     INVERTED_CONTROLS = "Inverted Controls"
     NO_LEFT_MOVEMENT = "Player Cannot Move Left"
     DOOR_CHANGES_POSITION = "Doors Change Position After 10 Moves"
-    TILES_TURN_RED = "Tiles Turn Red After Stepping On Them" 
\ No newline at end of file
+    TILES_TURN_RED = "Tiles Turn Red After Stepping On Them"
+
+
+# Rules in a fixed order, so a rule can be stored as its index
+RULES = list(RuleType)
@@ -1,10 +1,21 @@
+import os
 import pygame
+import sqlite3
 import sys
+import time
+import zipfile
 from .constants import *
 from .game_state import GameState
 from .player import Player
 from .input_handler import InputHandler
 from .renderer import Renderer
+from .render_thread import RenderThread
+from .run_history import RunHistory
+from .heatmap import Heatmap
+from .hint_search import HintSearch
+from .save_game import SaveGame
+from .spectator import SpectatorServer
+from .telemetry import Telemetry
 
 class PuzzleGame:
     
@@ -15,18 +26,63 @@ class PuzzleGame:
         self.clock = pygame.time.Clock()
         
         # Initialize game components
-        self.game_state = GameState()
+        self.telemetry = Telemetry() if TELEMETRY_ENABLED else None
+        self.game_state = GameState(telemetry=self.telemetry)
         self.player = Player()
         self.input_handler = InputHandler()
         self.renderer = Renderer(self.screen)
+        if os.path.exists(HEATMAP_FILE):
+            # The overlay is optional, so a damaged file only disables it
+            try:
+                self.renderer.set_heatmap(Heatmap.load(HEATMAP_FILE))
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+                print(f"Error loading heatmap: {e}")
+        self.render_thread = None
+        self.hint_search = HintSearch()
+        self.hint_key = None
+        self.hint = None
         
-        # Generate first level
-        self.game_state.generate_level()
+        # Finished levels and games go to the local run history
+        self.history = None
+        if RUN_HISTORY_ENABLED:
+            try:
+                self.history = RunHistory()
+            except sqlite3.Error as e:
+                print(f"Error opening run history: {e}")
+        self.session_moves = 0
+        self.session_restarts = 0
+        self.session_start = time.perf_counter()
+        
+        # Optionally broadcast the session to live spectators
+        self.spectator = None
+        if SPECTATOR_ENABLED:
+            try:
+                self.spectator = SpectatorServer()
+                print(f"Broadcasting to spectators on port {self.spectator.address[1]}")
+            except OSError as e:
+                print(f"Error starting spectator broadcast: {e}")
+        
+        # Resume where the last session was quit if it was saved, otherwise generate the first level
         self.player.reset()
+        self.save_game = SaveGame()
+        if self.save_game.load(self.game_state, self.player):
+            # Carry the earlier sittings into the totals the run is recorded with
+            self.session_moves, self.session_restarts, session_seconds = self.save_game.session
+            self.session_start = time.perf_counter() - session_seconds
+            print(f"Resumed level {self.game_state.level} with {self.game_state.moves} moves used")
+        else:
+            self.game_state.generate_level()
     
     def run(self):
         running = True
         
+        if THREADED_RENDERING:
+            self.render_thread = RenderThread(self.renderer, self.input_handler)
+            self.render_thread.publish(self._snapshot())
+            self.render_thread.start()
+        if self.spectator is not None:
+            self.spectator.publish(self.game_state.snapshot())
+        
         while running:
             # Handle events
             events = pygame.event.get()
@@ -34,27 +90,80 @@ class PuzzleGame:
             
             if actions['quit']:
                 running = False
-            elif actions['restart']:
-                self._restart_level()
             
-            # Handle input and movement
-            self._handle_movement(events)
+            # Apply every queued command in arrival order
+            state_changed = self._process_commands()
             
-            # Check game state
-            self._check_game_state()
+            # Pick up a finished hint without waiting for the search
+            if self.hint_key is not None and self.hint is None:
+                self.hint = self.hint_search.get(self.hint_key)
+                state_changed = state_changed or self.hint is not None
             
-            # Render the game
-            self.renderer.render(self.game_state, self.player)
+            if state_changed and self.spectator is not None:
+                self.spectator.publish(self.game_state.snapshot())
             
-            # Control frame rate
-            self.clock.tick(FPS)
+            if self.render_thread is not None:
+                # Hand the new state to the render thread and keep polling input
+                if state_changed:
+                    self.render_thread.publish(self._snapshot())
+                self.clock.tick(SIMULATION_HZ)
+            else:
+                # Render the game
+                self.renderer.render_snapshot(self._snapshot())
+                self.input_handler.mark_presented()
+                
+                # Control frame rate
+                self.clock.tick(FPS)
         
+        # Quitting keeps the session so the next launch resumes it
+        session = (self.session_moves, self.session_restarts, time.perf_counter() - self.session_start)
+        self.save_game.save(self.game_state, self.player, session)
         self._cleanup()
     
-    def _handle_movement(self, events):
+    def _snapshot(self):
+        """Snapshot the game state, tagged with the last applied input"""
+        snapshot = self.game_state.snapshot(self.input_handler.applied_count)
+        if self.hint is not None:
+            snapshot = snapshot._replace(hint_cells=tuple(self.hint['cells']))
+        if self.history is not None:
+            snapshot = snapshot._replace(
+                best_moves=self.history.best_moves(self.game_state.level, self.game_state.current_rule),
+                leaderboard=tuple(self.history.leaderboard())
+            )
+        return snapshot
+    
+    def _process_commands(self) -> bool:
+        """Apply queued restart and movement commands one at a time"""
+        queued = self.input_handler.next_command()
+        processed = queued is not None
+        
+        while queued is not None:
+            command, timestamp = queued
+            if command == 'hint':
+                self.hint_key = self.hint_search.request(self.game_state)
+            elif command == 'heatmap':
+                if not self.renderer.toggle_heatmap() and self.renderer.heatmap is None:
+                    print(f"No heatmap loaded from {HEATMAP_FILE}; build one with: python -m src.heatmap")
+            else:
+                # Any state change makes the current hint stale
+                self.hint_key = None
+                self.hint = None
+                if command == 'restart':
+                    self._restart_level()
+                else:
+                    self._handle_movement(command)
+            
+            # Check game state after each command so later moves see the result
+            self._check_game_state()
+            self.input_handler.mark_applied(timestamp)
+            queued = self.input_handler.next_command()
+        
+        return processed
+    
+    def _handle_movement(self, command: str):
         """Handle player movement based on input"""
-        dx, dy = self.input_handler.get_single_movement(
-            events, 
+        dx, dy = self.input_handler.translate_movement(
+            command, 
             self.game_state.reverse_controls,
             self.game_state.no_left_movement
         )
@@ -71,11 +180,14 @@ class PuzzleGame:
     
     def _next_level(self):
         """Advance to next level"""
+        self._record_level_end('level_complete')
         if self.game_state.level < MAX_LEVELS:
             self.game_state.next_level()
             self.player.reset()
         else:
             print("Congratulations! You've completed all levels!")
+            self._record_game(won=True)
+            self.save_game.delete()
             self._cleanup()
             sys.exit()
     
@@ -87,11 +199,64 @@ class PuzzleGame:
     def _game_over(self):
         """Handle game over"""
         print(f"Game Over! You reached level {self.game_state.level}")
+        self._record_level_end('game_over')
+        self._record_game(won=False)
+        self.save_game.delete()
         self._cleanup()
         sys.exit()
     
+    def _record_level_end(self, event: str):
+        """Record how a level ended, with the moves, restarts and time it took"""
+        game_state = self.game_state
+        duration = round(game_state.level_duration(), 3)
+        game_state.telemetry.record(
+            event, game_state.level, game_state.current_rule, game_state.moves,
+            game_state.restarts, duration
+        )
+        
+        self.session_moves += game_state.moves
+        self.session_restarts += game_state.restarts
+        if self.history is not None:
+            self.history.record_level(
+                game_state.level, game_state.current_rule, game_state.moves,
+                game_state.restarts, duration, event == 'level_complete'
+            )
+    
+    def _record_game(self, won: bool):
+        """Record the finished game in the run history"""
+        if self.history is None:
+            return
+        levels_completed = self.game_state.level if won else self.game_state.level - 1
+        self.history.record_game(
+            levels_completed, self.session_moves, self.session_restarts,
+            round(time.perf_counter() - self.session_start, 3), won
+        )
+    
+    def _report_latency(self):
+        """Print the input-to-present latency report"""
+        report = self.input_handler.get_latency_report()
+        if report['samples'] == 0:
+            return
+        print(
+            f"Input latency over {report['samples']} inputs: "
+            f"mean {report['mean_ms']:.1f} ms, p50 {report['p50_ms']:.1f} ms, "
+            f"p95 {report['p95_ms']:.1f} ms, p99 {report['p99_ms']:.1f} ms, "
+            f"max {report['max_ms']:.1f} ms "
+            f"({report['over_budget']} over the {report['budget_ms']} ms budget)"
+        )
+    
     def _cleanup(self):
         """Clean up pygame resources"""
+        if self.render_thread is not None:
+            self.render_thread.stop()
+        self.hint_search.stop()
+        if self.spectator is not None:
+            self.spectator.stop()
+        self._report_latency()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        if self.history is not None:
+            self.history.close()
         pygame.quit()
 
         sys.exit() 
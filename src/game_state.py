@@ -1,20 +1,25 @@
+import copy
 import random
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional, Tuple
 from .constants import *
+from .distance_field import DistanceField
 from .enums import RuleType
 from .level_generator import LevelGenerator
+from .level_hash import door_key, level_hash, player_key, tile_key
 from .level_loader import LevelLoader
-from .sprite import Sprite
+from .snapshot import StateSnapshot
+from .telemetry import NULL_TELEMETRY
+from .tracing import traced
 
 class GameState:
     """Manages the current game state and level progression"""
     
-    def __init__(self):
+    def __init__(self, campaign_seed: int = None, use_level_files: bool = True, telemetry=None):
         self.level = 1
         self.player_pos = [0, 0]
         self.door_pos = [0, 0]
         self.grid = []
-        self.sprites = {}  
         self.current_rule = None
         self.teleporters = []
         self.speed_boosts = []
@@ -26,15 +31,28 @@ class GameState:
         self.tiles_turn_red = False
         self.moves = 0
         self.max_moves = MAX_MOVES
-        self.level_generator = LevelGenerator()
+        self.level_generator = LevelGenerator(campaign_seed)
+        self.rng = random.Random()
         self.level_loader = LevelLoader()
         self.stepped_tiles = set() 
         self.door_move_counter = 0  
+        self.base_grid = ()
+        self.changed_tiles = []
+        self.level_epoch = 0
+        self.distance_field = None
+        self.use_level_files = use_level_files
+        self.restarts = 0
+        self.state_hash = 0
+        self.telemetry = telemetry or NULL_TELEMETRY
+        self.level_start_time = time.perf_counter()
         
+    @traced(category="load")
     def generate_level(self):
         """Generate a new level with the current rules"""
         # Try to load level from file first
-        level_data = self.level_loader.load_level_from_file(self.level)
+        level_data = None
+        if self.use_level_files:
+            level_data = self.level_loader.load_level_from_file(self.level)
 
         
         if level_data:
@@ -44,8 +62,19 @@ class GameState:
             # Generate level procedurally
             self._generate_procedural_level()
         
-        # Create sprites for all tiles
-        self._create_sprites()
+        # Freeze the freshly loaded grid so snapshots and resets can share it
+        self.base_grid = tuple(tuple(row) for row in self.grid)
+        self.start_player_pos = self.player_pos.copy()
+        self.start_door_pos = self.door_pos.copy()
+        self.changed_tiles = []
+        self.level_epoch += 1
+        self.rehash()
+        
+        # Distances to the door, repaired incrementally as tiles turn red or the door moves
+        self.rebuild_distance_field()
+        
+        self.level_start_time = time.perf_counter()
+        self.telemetry.record('level_start', self.level, self.current_rule)
     
     def _load_level_from_data(self, level_data: Dict):
         """Load level from level data"""
@@ -57,9 +86,10 @@ class GameState:
         self.player_pos = level_data['player_pos']
         self.door_pos = level_data['door_pos']
         
-        # Set the 3rd rule randomly for this level
-        self.current_rule = self._get_rule_for_level(self.level)
+        # Set the 3rd rule randomly for this level unless the level names one
+        self.current_rule = level_data.get('current_rule') or self._get_rule_for_level(self.level)
         self._set_rule_flags()
+        self.rng = self.level_generator.rng_for_level(self.level, "door")
         
         self.moves = 0
         self.stepped_tiles = set()
@@ -79,11 +109,10 @@ class GameState:
         self.red_tiles = level_data['red_tiles']
         self.walls = level_data['walls']
         self.current_rule = level_data['current_rule']
-        
-        # Now find a valid door position on an empty tile
-        self.door_pos = self._find_valid_door_position()
+        self.door_pos = level_data['door_pos']
         
         self._set_rule_flags()
+        self.rng = self.level_generator.rng_for_level(self.level, "door")
         self.moves = 0
         self.stepped_tiles = set()
         self.door_move_counter = 0
@@ -96,9 +125,13 @@ class GameState:
             RuleType.DOOR_CHANGES_POSITION,
             RuleType.TILES_TURN_RED
         ]
-        # Use level number as seed for consistent rule per level
-        random.seed(level)
-        return random.choice(rules)
+        # Use level number as seed for consistent rule per level, on a private RNG
+        return random.Random(level).choice(rules)
+    
+    def set_rule(self, rule: RuleType):
+        """Set the 3rd rule and its flags"""
+        self.current_rule = rule
+        self._set_rule_flags()
     
     def _set_rule_flags(self):
         """Set rule flags based on current rule"""
@@ -107,65 +140,49 @@ class GameState:
         self.door_changes_position = (self.current_rule == RuleType.DOOR_CHANGES_POSITION)
         self.tiles_turn_red = (self.current_rule == RuleType.TILES_TURN_RED)
     
-    def _create_sprites(self):
-        """Create sprite objects for all tiles, door, and player"""
-        self.sprites = {}
-        
-        # Create sprites for all tiles
-        for y in range(TILE_HEIGHT):
-            for x in range(TILE_WIDTH):
-                tile_type = self.grid[y][x]
-                sprite_type = self._get_sprite_type(tile_type)
-                color = self._get_tile_color(tile_type)
-                
-                sprite = Sprite(x, y, sprite_type, color)
-                self.sprites[(x, y)] = sprite
-        
-        # Create door sprite
-        door_sprite = Sprite(self.door_pos[0], self.door_pos[1], SPRITE_DOOR, BROWN, DOOR_SIZE)
-        self.sprites['door'] = door_sprite
-        
-        # Create player sprite
-        player_sprite = Sprite(self.player_pos[0], self.player_pos[1], SPRITE_PLAYER, BLUE, PLAYER_SIZE)
-        self.sprites['player'] = player_sprite
-    
-    def _get_sprite_type(self, tile_type: int) -> str:
-        """Get sprite type from tile type"""
-        if tile_type == TILE_WALL:
-            return SPRITE_WALL
-        elif tile_type == TILE_TELEPORTER:
-            return SPRITE_TELEPORTER
-        elif tile_type == TILE_SPEED_BOOST:
-            return SPRITE_SPEED_BOOST
-        elif tile_type == TILE_RED:
-            return SPRITE_RED
-        else:
-            return SPRITE_EMPTY
-    
-    def _get_tile_color(self, tile_type: int) -> tuple:
-        """Get color from tile type"""
-        if tile_type == TILE_WALL:
-            return GRAY
-        elif tile_type == TILE_TELEPORTER:
-            return PURPLE
-        elif tile_type == TILE_SPEED_BOOST:
-            return ORANGE
-        elif tile_type == TILE_RED:
-            return RED
-        else:
-            return WHITE
-    
     def next_level(self):
         """Advance to next level"""
         if self.level < MAX_LEVELS:
             self.level += 1
+            self.restarts = 0
             self.generate_level()
         else:
             print("Congratulations! You've completed all levels!")
     
+    @traced(category="reset")
     def reset_level(self):
-        """Reset current level"""
-        self.generate_level()
+        """Reset current level in place, undoing only the tiles changed since it was loaded"""
+        self.restarts += 1
+        if not self.base_grid:
+            self.telemetry.record('restart', self.level, self.moves, self.restarts)
+            self.generate_level()
+            return
+        
+        restored = []
+        for x, y, _ in self.changed_tiles:
+            tile_type = self.base_grid[y][x]
+            if self.grid[y][x] == tile_type:
+                continue
+            self.state_hash ^= tile_key(x, y, self.grid[y][x]) ^ tile_key(x, y, tile_type)
+            self.grid[y][x] = tile_type
+            restored.append((x, y, tile_type))
+        
+        if restored and self.distance_field is not None:
+            self.distance_field.set_tiles(restored)
+        self.changed_tiles = []
+        self.stepped_tiles.clear()
+        self.telemetry.record('restart', self.level, self.moves, self.restarts)
+        self.moves = 0
+        self.door_move_counter = 0
+        self.level_epoch += 1
+        
+        # Door relocations replay the same sequence after every reset
+        self.rng = self.level_generator.rng_for_level(self.level, "door")
+        if self.door_pos != self.start_door_pos:
+            self.set_door_position(self.start_door_pos.copy())
+        
+        self.state_hash ^= player_key(self.player_pos) ^ player_key(self.start_player_pos)
+        self.player_pos = self.start_player_pos.copy()
     
     def is_game_over(self) -> bool:
         """Check if game is over (out of moves)"""
@@ -177,20 +194,24 @@ class GameState:
     
     def update_player_position(self, new_pos: List[int]):
         """Update player position from player object"""
+        self.state_hash ^= player_key(self.player_pos) ^ player_key(new_pos)
         self.player_pos = new_pos
-        if 'player' in self.sprites:
-            self.sprites['player'].set_position(new_pos[0], new_pos[1])
         
         # Handle tiles turning red after stepping on them
         if self.tiles_turn_red:
             pos_tuple = (new_pos[0], new_pos[1])
             if pos_tuple not in self.stepped_tiles and self.grid[new_pos[1]][new_pos[0]] == TILE_EMPTY:
                 self.stepped_tiles.add(pos_tuple)
-                self.grid[new_pos[1]][new_pos[0]] = TILE_RED
-                # Update sprite
-                if pos_tuple in self.sprites:
-                    self.sprites[pos_tuple].color = RED
-                    self.sprites[pos_tuple].sprite_type = SPRITE_RED
+                self.set_tile(new_pos[0], new_pos[1], TILE_RED)
+    
+    @traced(category="move")
+    def set_tile(self, x: int, y: int, tile_type: int):
+        """Change a tile during play, keeping snapshots and the distance field in step"""
+        self.state_hash ^= tile_key(x, y, self.grid[y][x]) ^ tile_key(x, y, tile_type)
+        self.grid[y][x] = tile_type
+        self.changed_tiles.append((x, y, tile_type))
+        if self.distance_field is not None:
+            self.distance_field.set_tile(x, y, tile_type)
     
     def increment_moves(self):
         """Increment move counter and handle door position changes"""
@@ -200,6 +221,7 @@ class GameState:
         if self.door_changes_position and self.moves % 10 == 0:
             self._change_door_position()
     
+    @traced(category="move")
     def _change_door_position(self):
         """Change door position randomly to an empty tile"""
         old_pos = self.door_pos.copy()
@@ -212,9 +234,73 @@ class GameState:
             new_pos = self._find_valid_door_position()
             attempts += 1
         
+        self.set_door_position(new_pos)
+        self.telemetry.record('door_relocated', self.level, new_pos[0], new_pos[1], self.moves)
+    
+    @traced(category="load")
+    def rebuild_distance_field(self):
+        """Recompute the distance field from scratch for the current grid, teleporters and door"""
+        self.distance_field = DistanceField(self.grid, self.teleporters, self.door_pos, self.no_left_movement)
+    
+    def rehash(self):
+        """Recompute the Zobrist hash of the tiles, player, door and teleporter pairs from scratch"""
+        self.state_hash = level_hash(self.grid, self.player_pos, self.door_pos, self.teleporters)
+    
+    def set_door_position(self, new_pos: List[int]):
+        """Move the door, keeping the distance field in step"""
+        self.state_hash ^= door_key(self.door_pos) ^ door_key(new_pos)
         self.door_pos = new_pos
-        if 'door' in self.sprites:
-            self.sprites['door'].set_position(new_pos[0], new_pos[1])
+        if self.distance_field is not None:
+            self.distance_field.set_door(new_pos)
+    
+    def clone(self) -> 'GameState':
+        """Copy the play state for look-ahead simulation, without the distance field"""
+        clone = copy.copy(self)
+        clone.grid = [row[:] for row in self.grid]
+        clone.player_pos = self.player_pos.copy()
+        clone.door_pos = self.door_pos.copy()
+        clone.stepped_tiles = set(self.stepped_tiles)
+        clone.changed_tiles = list(self.changed_tiles)
+        clone.distance_field = None
+        clone.telemetry = NULL_TELEMETRY
+        if self.door_changes_position:
+            clone.rng = random.Random()
+            clone.rng.setstate(self.rng.getstate())
+        return clone
+    
+    def snapshot(self, input_seq: int = 0) -> StateSnapshot:
+        """Get an immutable snapshot of the state for rendering"""
+        return StateSnapshot(
+            self.level,
+            self.level_epoch,
+            self.current_rule,
+            self.base_grid,
+            tuple(self.changed_tiles),
+            (self.player_pos[0], self.player_pos[1]),
+            (self.door_pos[0], self.door_pos[1]),
+            self.moves,
+            self.max_moves,
+            input_seq
+        )
+    
+    def distance_to_door(self) -> Optional[int]:
+        """Get the fewest moves from the player to the door, or None if it cannot be reached"""
+        if self.distance_field is None:
+            return None
+        return self.distance_field.distance(self.player_pos[0], self.player_pos[1])
+    
+    def get_hint_direction(self) -> Optional[Tuple[int, int]]:
+        """Get the key direction of the best next move towards the door"""
+        if self.distance_field is None:
+            return None
+        move = self.distance_field.best_move(self.player_pos[0], self.player_pos[1])
+        if move is not None and self.reverse_controls:
+            return (-move[0], -move[1])
+        return move
+    
+    def level_duration(self) -> float:
+        """Get the seconds spent on the current level, restarts included"""
+        return time.perf_counter() - self.level_start_time
     
     def get_remaining_moves(self) -> int:
         """Get remaining moves"""
@@ -245,8 +331,8 @@ class GameState:
         
         while attempts < max_attempts:
             pos = [
-                random.randint(DOOR_MIN_COORD, TILE_WIDTH-1), 
-                random.randint(DOOR_MIN_COORD, TILE_HEIGHT-1)
+                self.rng.randint(DOOR_MIN_COORD, TILE_WIDTH-1), 
+                self.rng.randint(DOOR_MIN_COORD, TILE_HEIGHT-1)
             ]
             if self._is_valid_door_position(pos):
                 return pos
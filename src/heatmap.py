@@ -0,0 +1,151 @@
+import argparse
+import glob
+import json
+import numpy as np
+from typing import Iterable, Optional
+from .constants import *
+
+# Count channels per level
+VISITS = 0
+DEATHS = 1
+TELEPORTS = 2
+CHANNELS = 3
+
+# Overlay colour of each channel
+CHANNEL_COLORS = np.array([YELLOW, BLACK, CYAN], dtype=np.float32)
+
+
+class Heatmap:
+    """Per-level counts of where runs walked, died on red tiles and teleported
+    
+    Telemetry NDJSON logs are streamed in batches of batch_size lines, each batch being
+    added to the (CHANNELS, H, W) count arrays with one np.add.at, so memory stays
+    bounded by the batch size and the number of levels, however many runs are read.
+    """
+    
+    def __init__(self, batch_size: int = HEATMAP_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.counts = {}
+        self.level_starts = 0
+    
+    def add_logs(self, paths: Iterable[str]):
+        """Stream every log file into the counts"""
+        for path in paths:
+            self.add_log(path)
+    
+    def add_log(self, path: str):
+        """Stream one telemetry log into the counts"""
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                batch = []
+                for line in file:
+                    batch.append(line)
+                    if len(batch) >= self.batch_size:
+                        self._add_lines(batch)
+                        batch = []
+                self._add_lines(batch)
+        except OSError as e:
+            print(f"Error reading telemetry log {path}: {e}")
+    
+    def _add_lines(self, lines):
+        """Parse a batch of log lines and add their positions in one vectorized update"""
+        levels, channels, ys, xs = [], [], [], []
+        
+        def add(level, channel, x, y):
+            if 0 <= x < TILE_WIDTH and 0 <= y < TILE_HEIGHT:
+                levels.append(level)
+                channels.append(channel)
+                ys.append(y)
+                xs.append(x)
+        
+        for line in lines:
+            try:
+                event = json.loads(line)
+                kind = event['event']
+                level = event['level']
+                if kind == 'move' or kind == 'speed_boost':
+                    add(level, VISITS, event['x'], event['y'])
+                elif kind == 'teleport':
+                    add(level, TELEPORTS, event['x'], event['y'])
+                    add(level, VISITS, event['to_x'], event['to_y'])
+                elif kind == 'red_tile_death':
+                    add(level, DEATHS, event['x'], event['y'])
+                elif kind == 'level_start':
+                    self.level_starts += 1
+            except (ValueError, KeyError, TypeError):
+                continue
+        
+        if not levels:
+            return
+        levels, channels, ys, xs = np.array(levels), np.array(channels), np.array(ys), np.array(xs)
+        for level in np.unique(levels):
+            mask = levels == level
+            counts = self.level_counts(int(level), create=True)
+            np.add.at(counts, (channels[mask], ys[mask], xs[mask]), 1)
+    
+    def level_counts(self, level: int, create: bool = False) -> Optional[np.ndarray]:
+        """Get the (CHANNELS, H, W) counts of a level"""
+        if create and level not in self.counts:
+            self.counts[level] = np.zeros((CHANNELS, TILE_HEIGHT, TILE_WIDTH), dtype=np.uint32)
+        return self.counts.get(level)
+    
+    def colors(self, level: int) -> Optional[np.ndarray]:
+        """Get an (H, W, 4) RGBA overlay for a level, or None if it has no counts
+        
+        Each channel is log-scaled against its own maximum; the colour mixes the channel
+        colours by intensity and the alpha follows the strongest channel.
+        """
+        counts = self.counts.get(level)
+        if counts is None or not counts.any():
+            return None
+        
+        scaled = np.log1p(counts.astype(np.float32))
+        peaks = scaled.reshape(CHANNELS, -1).max(axis=1)
+        intensity = scaled / np.where(peaks > 0, peaks, 1)[:, None, None]
+        
+        total = intensity.sum(axis=0)
+        mix = np.einsum('chw,cr->hwr', intensity, CHANNEL_COLORS) / np.where(total > 0, total, 1)[:, :, None]
+        rgba = np.empty((TILE_HEIGHT, TILE_WIDTH, 4), dtype=np.uint8)
+        rgba[..., :3] = mix.astype(np.uint8)
+        rgba[..., 3] = (intensity.max(axis=0) * HEATMAP_MAX_ALPHA).astype(np.uint8)
+        return rgba
+    
+    def save(self, path: str = HEATMAP_FILE):
+        """Write the counts to an .npz file"""
+        arrays = {f"counts_{level}": counts for level, counts in self.counts.items()}
+        try:
+            np.savez_compressed(path, level_starts=np.array(self.level_starts), **arrays)
+        except OSError as e:
+            print(f"Error saving heatmap: {e}")
+    
+    @classmethod
+    def load(cls, path: str = HEATMAP_FILE) -> 'Heatmap':
+        """Read counts written by save"""
+        heatmap = cls()
+        with np.load(path) as data:
+            heatmap.level_starts = int(data['level_starts'])
+            for name in data.files:
+                if name.startswith('counts_'):
+                    heatmap.counts[int(name[len('counts_'):])] = data[name]
+        return heatmap
+
+
+def main():
+    """Aggregate telemetry logs into a heatmap file"""
+    parser = argparse.ArgumentParser(description="Aggregate Trium telemetry into a path heatmap")
+    parser.add_argument('logs', nargs='*', help=f"telemetry logs (default: {TELEMETRY_FILE}*)")
+    parser.add_argument('-o', '--output', default=HEATMAP_FILE, help="heatmap file to write")
+    args = parser.parse_args()
+    
+    paths = args.logs or sorted(glob.glob(TELEMETRY_FILE + '*'))
+    heatmap = Heatmap()
+    heatmap.add_logs(paths)
+    heatmap.save(args.output)
+    
+    cells = sum(int(counts.sum()) for counts in heatmap.counts.values())
+    print(f"Aggregated {heatmap.level_starts} level starts and {cells} positions over "
+          f"{len(heatmap.counts)} levels from {len(paths)} logs into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from .constants import *
+from .distance_field import DistanceField
+from .player import Player
+
+class HintSearch:
+    """Anytime beam search for the next moves, run on a worker thread within a time budget"""
+    
+    DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    
+    def __init__(self, time_budget_ms: float = HINT_TIME_BUDGET_MS, cache_size: int = HINT_CACHE_SIZE):
+        self.time_budget = time_budget_ms / 1000
+        self.cache_size = cache_size
+        self.results = OrderedDict()
+        
+        # Only the newest request is kept; older unanswered ones are superseded
+        self.pending = None
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="trium-hints", daemon=True)
+        self._thread.start()
+    
+    def request(self, game_state):
+        """Ask for a hint for the current state and return the key to collect it with"""
+        requested_at = time.perf_counter()
+        key = self.state_key(game_state)
+        if key not in self.results:
+            self.pending = (key, game_state.clone(), requested_at)
+            self._wakeup.set()
+        return key
+    
+    def get(self, key) -> Optional[dict]:
+        """Get the finished hint for a key, or None if it is still being searched"""
+        return self.results.get(key)
+    
+    def stop(self):
+        """Stop the worker thread"""
+        self._stopped = True
+        self._wakeup.set()
+    
+    def state_key(self, game_state) -> tuple:
+        """Get a hashable key that identifies a game state for memoisation"""
+        # The incrementally maintained Zobrist hash covers tiles, player, door and teleporters
+        return (game_state.state_hash, game_state.moves, game_state.current_rule)
+    
+    def _run(self):
+        """Worker loop: search the newest pending state whenever woken"""
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopped:
+                return
+            
+            pending, self.pending = self.pending, None
+            if pending is None:
+                continue
+            key, root, requested_at = pending
+            
+            result = self.search(root, requested_at)
+            self.results[key] = result
+            if len(self.results) > self.cache_size:
+                self.results.popitem(last=False)
+    
+    def search(self, root, start: float = None) -> dict:
+        """Search from a cloned state until solved or out of time; return the best line found
+        
+        The budget runs from start, the time of the request, so cloning, waiting for the
+        worker and building the distance field all count against it.
+        """
+        if start is None:
+            start = time.perf_counter()
+        deadline = start + self.time_budget
+        field = DistanceField(root.grid, root.teleporters, root.door_pos, root.no_left_movement)
+        
+        best = {'path': [], 'cells': [], 'distance': self._estimate(field, root), 'solved': False}
+        nodes = 0
+        width = 4
+        
+        # Widen the beam each pass; every pass is a complete answer on its own
+        while time.perf_counter() < deadline and width <= HINT_MAX_BEAM_WIDTH:
+            line, expanded, finished = self._beam_search(root, field, width, deadline)
+            nodes += expanded
+            if line is not None and self._is_better(line, best):
+                best = line
+            if not finished:
+                break
+            width *= 2
+        
+        return {
+            'moves': [self._to_key_direction(root, move) for move in best['path']],
+            'cells': best['cells'],
+            'solved': best['solved'],
+            'distance': best['distance'],
+            'nodes': nodes,
+            'elapsed_ms': (time.perf_counter() - start) * 1000
+        }
+    
+    def _beam_search(self, root, field, width: int, deadline: float):
+        """Run one beam search pass, returning (best line, nodes expanded, finished in time)"""
+        frontier = [(root, [], [])]
+        best = None
+        expanded = 0
+        
+        while frontier:
+            children = {}
+            for state, path, cells in frontier:
+                for direction in self.DIRECTIONS:
+                    if time.perf_counter() >= deadline:
+                        return best, expanded, False
+                    
+                    child = self._apply(state, direction)
+                    if child is None:
+                        continue
+                    expanded += 1
+                    
+                    child_path = path + [direction]
+                    child_cells = cells + [tuple(child.player_pos)]
+                    if child.is_level_complete():
+                        line = {'path': child_path, 'cells': child_cells, 'distance': 0, 'solved': True}
+                        return line, expanded, True
+                    if child.is_game_over():
+                        continue
+                    
+                    # Keep one line per (player, door, moves) so the beam is not wasted on duplicates
+                    distance = self._estimate(field, child)
+                    signature = (tuple(child.player_pos), tuple(child.door_pos), child.moves)
+                    if signature not in children or distance < children[signature][0]:
+                        children[signature] = (distance, child, child_path, child_cells)
+            
+            ranked = sorted(children.values(), key=lambda entry: (entry[0], entry[1].moves))[:width]
+            if ranked:
+                distance, _, path, cells = ranked[0]
+                line = {'path': path, 'cells': cells, 'distance': distance, 'solved': False}
+                if best is None or distance < best['distance']:
+                    best = line
+            frontier = [(child, path, cells) for _, child, path, cells in ranked]
+        
+        return best, expanded, True
+    
+    def _apply(self, state, direction: Tuple[int, int]):
+        """Play one move on a copy of the state with Player.move, or None if it is not useful"""
+        dx, dy = direction
+        x, y = state.player_pos[0] + dx, state.player_pos[1] + dy
+        if state.no_left_movement and dx < 0:
+            return None
+        
+        # Player.move would restart the level here, which ends this line instead
+        if 0 <= x < TILE_WIDTH and 0 <= y < TILE_HEIGHT and state.grid[y][x] == TILE_RED:
+            return None
+        
+        child = state.clone()
+        player = Player()
+        player.position = child.player_pos.copy()
+        if not player.move(dx, dy, child):
+            return None
+        return child
+    
+    def _estimate(self, field: DistanceField, state) -> float:
+        """Estimate moves left from a state using the distance field for its door"""
+        field.set_door(state.door_pos)
+        return field.dist[state.player_pos[1] * field.width + state.player_pos[0]]
+    
+    def _is_better(self, line: dict, best: dict) -> bool:
+        """Check if a line beats the best one so far"""
+        if line['solved'] != best['solved']:
+            return line['solved']
+        if line['solved']:
+            return len(line['path']) < len(best['path'])
+        return line['distance'] < best['distance']
+    
+    def _to_key_direction(self, state, move: Tuple[int, int]) -> Tuple[int, int]:
+        """Get the key to press for a move under the state's controls"""
+        if state.reverse_controls:
+            return (-move[0], -move[1])
+        return move
@@ -1,9 +1,19 @@
+import time
 import pygame
+from collections import deque
+from typing import Optional, Tuple
 from .constants import *
 
 class InputHandler:
     """Handles keyboard input and player controls"""
     
+    DIRECTIONS = {
+        'left': (-1, 0),
+        'right': (1, 0),
+        'up': (0, -1),
+        'down': (0, 1)
+    }
+    
     def __init__(self):
         self.keys = {
             'left': [pygame.K_LEFT, pygame.K_a],
@@ -11,8 +21,24 @@ class InputHandler:
             'up': [pygame.K_UP, pygame.K_w],
             'down': [pygame.K_DOWN, pygame.K_s],
             'restart': pygame.K_r,
+            'hint': pygame.K_h,
+            'heatmap': pygame.K_m,
             'quit': pygame.K_ESCAPE
         }
+        
+        # Key -> command lookup so each KEYDOWN is resolved in O(1)
+        self.key_commands = {pygame.K_r: 'restart', pygame.K_h: 'hint', pygame.K_m: 'heatmap'}
+        for direction in self.DIRECTIONS:
+            for key in self.keys[direction]:
+                self.key_commands[key] = direction
+        
+        # Commands waiting to be applied, as (command, timestamp) in arrival order
+        self.command_queue = deque()
+        
+        # (sequence, timestamp) of applied commands that have not been presented yet
+        self.applied_count = 0
+        self.awaiting_present = deque()
+        self.latency_samples = deque(maxlen=LATENCY_SAMPLE_SIZE)
     
     def get_movement(self, reverse_controls: bool = False, no_left_movement: bool = False) -> tuple[int, int]:
         """Get movement direction from keyboard input"""
@@ -33,37 +59,88 @@ class InputHandler:
         
         return dx, dy
     
-    def get_single_movement(self, events, reverse_controls: bool = False, no_left_movement: bool = False) -> tuple[int, int]:
-        """Get movement direction from single key press events"""
-        dx, dy = 0, 0
-        
-        for event in events:
-            if event.type == pygame.KEYDOWN:
-                if event.key in self.keys['left'] and not no_left_movement:
-                    dx = -1 if not reverse_controls else 1
-                elif event.key in self.keys['right']:
-                    dx = 1 if not reverse_controls else -1
-                elif event.key in self.keys['up']:
-                    dy = -1 if not reverse_controls else 1
-                elif event.key in self.keys['down']:
-                    dy = 1 if not reverse_controls else -1
-        
-        return dx, dy
-    
     def handle_events(self, events) -> dict:
-        """Handle pygame events and return action dictionary"""
+        """Handle pygame events in a single pass, queueing every command in order"""
         actions = {
-            'restart': False,
             'quit': False
         }
         
+        timestamp = time.perf_counter()
         for event in events:
             if event.type == pygame.QUIT:
                 actions['quit'] = True
             elif event.type == pygame.KEYDOWN:
-                if event.key == self.keys['restart']:
-                    actions['restart'] = True
-                elif event.key == self.keys['quit']:
+                if event.key == self.keys['quit']:
                     actions['quit'] = True
+                else:
+                    command = self.key_commands.get(event.key)
+                    if command is not None:
+                        self.command_queue.append((command, timestamp))
+        
+        return actions
+    
+    def next_command(self) -> Optional[Tuple[str, float]]:
+        """Pop the oldest queued (command, timestamp) pair, or None if the queue is empty"""
+        if self.command_queue:
+            return self.command_queue.popleft()
+        return None
+    
+    def translate_movement(self, command: str, reverse_controls: bool = False, no_left_movement: bool = False) -> tuple[int, int]:
+        """Get movement direction for a queued command under the current rules"""
+        if command not in self.DIRECTIONS:
+            return 0, 0
+        if command == 'left' and no_left_movement:
+            return 0, 0
+        
+        dx, dy = self.DIRECTIONS[command]
+        if reverse_controls:
+            return -dx, -dy
+        return dx, dy
+    
+    def mark_applied(self, timestamp: float):
+        """Record that a command with this timestamp reached the simulation"""
+        self.applied_count += 1
+        self.awaiting_present.append((self.applied_count, timestamp))
+    
+    def mark_presented(self, present_time: float = None, upto_seq: int = None):
+        """Record that applied commands up to upto_seq (default: all) are now visible on screen"""
+        if present_time is None:
+            present_time = time.perf_counter()
+        
+        # Only the presenting thread pops, so this is safe alongside mark_applied
+        while self.awaiting_present:
+            seq, timestamp = self.awaiting_present[0]
+            if upto_seq is not None and seq > upto_seq:
+                break
+            self.awaiting_present.popleft()
+            self.latency_samples.append(present_time - timestamp)
+    
+    def get_latency_report(self) -> dict:
+        """Get input-to-present latency statistics in milliseconds"""
+        samples = sorted(self.latency_samples)
+        report = {
+            'samples': len(samples),
+            'budget_ms': INPUT_LATENCY_BUDGET_MS,
+            'mean_ms': 0.0,
+            'p50_ms': 0.0,
+            'p95_ms': 0.0,
+            'p99_ms': 0.0,
+            'max_ms': 0.0,
+            'over_budget': 0
+        }
+        
+        if not samples:
+            return report
+        
+        def percentile(fraction):
+            index = min(len(samples) - 1, int(fraction * len(samples)))
+            return samples[index] * 1000
         
-        return actions 
\ No newline at end of file
+        budget = INPUT_LATENCY_BUDGET_MS / 1000
+        report['mean_ms'] = sum(samples) / len(samples) * 1000
+        report['p50_ms'] = percentile(0.50)
+        report['p95_ms'] = percentile(0.95)
+        report['p99_ms'] = percentile(0.99)
+        report['max_ms'] = samples[-1] * 1000
+        report['over_budget'] = sum(1 for sample in samples if sample > budget)
+        return report
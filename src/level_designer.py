@@ -0,0 +1,248 @@
+import argparse
+import math
+import os
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from .constants import *
+from .distance_field import UNREACHABLE, DistanceField
+from .enums import RuleType
+from .level_generator import LevelGenerator
+from .level_hash import LevelIndex
+from .level_loader import LevelLoader
+
+# Tiles the designer places and removes
+OBSTACLES = (TILE_WALL, TILE_RED)
+
+# Score of a layout whose door cannot be reached at all
+UNSOLVABLE_SCORE = TILE_WIDTH * TILE_HEIGHT
+
+
+class LevelDesigner:
+    """Local search that mutates generated levels until their optimal solution length hits a target
+    
+    Difficulty is the fewest game moves from the player to the door, counting a speed
+    boost carry as two like the move counter, read from a DistanceField built under the
+    level's rule. Each mutation adds, removes or swaps a
+    wall or red tile, or moves a teleporter, through the field, which repairs only the
+    distances the change invalidates; a rejected mutation is undone the same way, so the
+    level is never solved from scratch. Worse layouts are accepted with a probability
+    that cools over the run, which lets the search walk out of plateaus.
+    
+    Teleporters are kept paired in reading order, as level files are paired on load.
+    Inverted controls do not change move counts and a shortest path never steps on a
+    cell twice, so red trails cannot lengthen it. Levels under DOOR_CHANGES_POSITION are
+    refused, since a single door cannot score them.
+    """
+    
+    def __init__(self, seed: int = None, target_min: int = DESIGNER_TARGET_MIN,
+                 target_max: int = DESIGNER_TARGET_MAX, max_obstacles: int = DESIGNER_MAX_OBSTACLES,
+                 temperature: float = DESIGNER_START_TEMPERATURE, output_dir: str = DESIGNER_OUTPUT_DIR):
+        self.generator = LevelGenerator(seed)
+        self.output_dir = output_dir
+        self.loader = None
+        self.rng = random.Random(seed)
+        self.target_min = target_min
+        self.target_max = target_max
+        self.max_obstacles = max_obstacles
+        self.temperature = temperature
+        
+        self.cells = TILE_WIDTH * TILE_HEIGHT
+        self.field = None
+        self.player_cell = 0
+        self.protected = set()
+        self.obstacles = 0
+        self.teleporter_cells = []
+    
+    def design(self, level: int, max_mutations: int = DESIGNER_MAX_MUTATIONS, rule: RuleType = None) -> Dict:
+        """Search for a layout of a level within the target, returning its level data and search stats"""
+        level_data = self.generator.generate_level(level, [0, 0])
+        if rule is None:
+            rule = level_data['current_rule']
+        if rule == RuleType.DOOR_CHANGES_POSITION:
+            raise ValueError(f"{rule.name} moves the door, which the designer cannot score")
+        self._start(level_data, rule)
+        
+        score = self._score()
+        mutations = 0
+        accepted = 0
+        start = time.perf_counter()
+        while score and mutations < max_mutations:
+            undo = self._mutate()
+            if undo is None:
+                continue
+            mutations += 1
+            
+            new_score = self._score()
+            temperature = self.temperature * (1 - mutations / max_mutations)
+            if new_score <= score or (temperature > 0 and
+                                      self.rng.random() < math.exp((score - new_score) / temperature)):
+                score = new_score
+                accepted += 1
+            else:
+                self._undo(undo)
+        elapsed = time.perf_counter() - start
+        
+        distance = self.field.dist[self.player_cell]
+        return {
+            'level_data': self._level_data(level_data, rule),
+            'distance': None if distance == UNREACHABLE else distance,
+            'in_target': score == 0,
+            'mutations': mutations,
+            'accepted': accepted,
+            'elapsed_s': elapsed,
+            'mutations_per_second': mutations / elapsed if elapsed > 0 else 0.0
+        }
+    
+    def save(self, level_number: int, level_data: Dict, index: Optional[LevelIndex] = None,
+             overwrite: bool = False) -> bool:
+        """Save a designed level to the output directory, skipping layouts already in the index
+        
+        An existing level file is only replaced when overwrite is set.
+        """
+        if self.loader is None:
+            self.loader = LevelLoader(self.output_dir)
+        
+        filename = os.path.join(self.output_dir, f"level_{level_number}.txt")
+        if not overwrite and os.path.exists(filename):
+            print(f"Level {level_number} not saved: {filename} already exists")
+            return False
+        return self.loader.save_level_to_file(level_number, level_data, index)
+    
+    def _start(self, level_data: Dict, rule: RuleType):
+        """Build the search state and distance field for a generated level"""
+        grid = level_data['grid']
+        player_pos = level_data['player_pos']
+        door_pos = level_data['door_pos']
+        
+        self.player_cell = player_pos[1] * TILE_WIDTH + player_pos[0]
+        self.protected = {self.player_cell, door_pos[1] * TILE_WIDTH + door_pos[0]}
+        self.obstacles = sum(tile_type in OBSTACLES for row in grid for tile_type in row)
+        self.teleporter_cells = [y * TILE_WIDTH + x for y, row in enumerate(grid)
+                                 for x, tile_type in enumerate(row) if tile_type == TILE_TELEPORTER]
+        self.field = DistanceField(grid, self._pairs(self.teleporter_cells), door_pos,
+                                   rule == RuleType.NO_LEFT_MOVEMENT, game_moves=True)
+    
+    def _score(self) -> int:
+        """Get how many moves the optimal solution is away from the target range"""
+        distance = self.field.dist[self.player_cell]
+        if distance == UNREACHABLE:
+            return UNSOLVABLE_SCORE
+        return max(0, self.target_min - distance, distance - self.target_max)
+    
+    def _mutate(self) -> Optional[Tuple]:
+        """Apply one random mutation, returning what undoes it or None if the draw was not usable"""
+        cell = self.rng.randrange(self.cells)
+        if cell in self.protected:
+            return None
+        
+        tile_type = self.field.tiles[cell]
+        if tile_type == TILE_EMPTY:
+            if self.obstacles >= self.max_obstacles:
+                return None
+            new_type = self.rng.choice(OBSTACLES)
+        elif tile_type == TILE_WALL:
+            new_type = self.rng.choice((TILE_EMPTY, TILE_RED))
+        elif tile_type == TILE_RED:
+            new_type = self.rng.choice((TILE_EMPTY, TILE_WALL))
+        elif tile_type == TILE_TELEPORTER:
+            target = self.rng.randrange(self.cells)
+            if target in self.protected or self.field.tiles[target] != TILE_EMPTY:
+                return None
+            old_cells = self.teleporter_cells
+            self._move_teleporter(cell, target)
+            return (cell, target, old_cells)
+        else:
+            # Speed boosts stay where the generator put them
+            return None
+        
+        self._set_tile(cell, new_type)
+        return (cell, tile_type)
+    
+    def _undo(self, undo: Tuple):
+        """Revert a mutation returned by _mutate"""
+        if len(undo) == 2:
+            self._set_tile(undo[0], undo[1])
+        else:
+            source, target, old_cells = undo
+            self.teleporter_cells = old_cells
+            self.field.move_teleporter(self._position(target), self._position(source), self._pairs(old_cells))
+    
+    def _set_tile(self, cell: int, tile_type: int):
+        """Change a tile through the distance field, keeping the obstacle count in step"""
+        self.obstacles += (tile_type in OBSTACLES) - (self.field.tiles[cell] in OBSTACLES)
+        self.field.set_tile(cell % TILE_WIDTH, cell // TILE_WIDTH, tile_type)
+    
+    def _move_teleporter(self, source: int, target: int):
+        """Move a teleporter tile and re-pair every teleporter in reading order"""
+        cells = [target if cell == source else cell for cell in self.teleporter_cells]
+        cells.sort()
+        self.teleporter_cells = cells
+        self.field.move_teleporter(self._position(source), self._position(target), self._pairs(cells))
+    
+    def _pairs(self, cells: List[int]) -> List:
+        """Pair sorted teleporter cells in reading order"""
+        return [[self._position(cells[i]), self._position(cells[i + 1])] for i in range(0, len(cells) - 1, 2)]
+    
+    def _position(self, cell: int) -> List[int]:
+        """Get the [x, y] position of a flat cell index"""
+        return [cell % TILE_WIDTH, cell // TILE_WIDTH]
+    
+    def _level_data(self, level_data: Dict, rule: RuleType) -> Dict:
+        """Build a level dict, as returned by LevelGenerator, from the current layout"""
+        tiles = self.field.tiles
+        grid = [tiles[y * TILE_WIDTH:(y + 1) * TILE_WIDTH] for y in range(TILE_HEIGHT)]
+        
+        def positions(tile_type):
+            return [self._position(cell) for cell in range(self.cells) if tiles[cell] == tile_type]
+        
+        return {
+            'grid': grid,
+            'teleporters': self._pairs(self.teleporter_cells),
+            'speed_boosts': positions(TILE_SPEED_BOOST),
+            'red_tiles': positions(TILE_RED),
+            'walls': positions(TILE_WALL),
+            'player_pos': list(level_data['player_pos']),
+            'door_pos': list(level_data['door_pos']),
+            'current_rule': rule
+        }
+
+
+def main():
+    """Design levels from the command line and optionally save them"""
+    parser = argparse.ArgumentParser(description="Tune Trium levels to a target optimal solution length")
+    parser.add_argument('levels', type=int, nargs='+', help="level numbers to design")
+    parser.add_argument('--seed', type=int, default=None, help="campaign seed of the starting levels")
+    parser.add_argument('--min', type=int, default=DESIGNER_TARGET_MIN,
+                        help="fewest optimal game moves, a speed boost counting as two")
+    parser.add_argument('--max', type=int, default=DESIGNER_TARGET_MAX,
+                        help="most optimal game moves, a speed boost counting as two")
+    parser.add_argument('--mutations', type=int, default=DESIGNER_MAX_MUTATIONS, help="mutations per level")
+    parser.add_argument('--save', action='store_true', help="save levels that hit the target")
+    parser.add_argument('--output', default=DESIGNER_OUTPUT_DIR, help="directory to save levels in")
+    parser.add_argument('--force', action='store_true', help="replace level files that already exist")
+    parser.add_argument('--index', nargs='?', const=LEVEL_INDEX_FILE, default=None,
+                        help=f"skip saving layouts already in this level index (default file: {LEVEL_INDEX_FILE})")
+    args = parser.parse_args()
+    
+    designer = LevelDesigner(args.seed, args.min, args.max, output_dir=args.output)
+    index = LevelIndex(args.index) if args.index else None
+    for level in args.levels:
+        try:
+            result = designer.design(level, args.mutations)
+        except ValueError as e:
+            print(f"Skipping level {level}: {e}")
+            continue
+        rule = result['level_data']['current_rule']
+        outcome = "in target" if result['in_target'] else "missed target"
+        print(f"Level {level} ({rule.name}): {result['distance']} optimal game moves, {outcome} after "
+              f"{result['mutations']:,} mutations ({result['accepted']:,} accepted) in {result['elapsed_s']:.2f} s, "
+              f"{result['mutations_per_second']:,.0f} mutations/s")
+        
+        if (args.save and result['in_target'] and
+                designer.save(level, result['level_data'], index, overwrite=args.force)):
+            print(f"Saved level {level} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,34 @@
+import hashlib
 import random
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 from .constants import *
 from .enums import RuleType
+from .tracing import traced
 
 class LevelGenerator:
     """Handles level generation and special tile placement"""
     
-    def __init__(self):
+    def __init__(self, campaign_seed: int = None):
+        # Each campaign seed is an independent family of level streams
+        if campaign_seed is None:
+            campaign_seed = random.SystemRandom().getrandbits(64)
+        self.campaign_seed = campaign_seed
+        self.rng = random.Random()
         self.grid = []
         self.teleporters = []
         self.speed_boosts = []
         self.red_tiles = []
         self.walls = []
         
+    @traced(category="generate")
     def generate_level(self, level: int, player_pos: List[int], door_pos: List[int] = None) -> dict:
         """Generate a new level with the current rules"""
         self._reset_level()
         self._create_empty_grid()
         
+        # Level N of a campaign depends only on (campaign seed, N)
+        self.rng = self.rng_for_level(level)
+        
         # Apply the 3rd rule based on level (randomly chosen from pool)
         current_rule = self._get_rule_for_level(level)
         
@@ -27,15 +38,36 @@ class LevelGenerator:
         self._add_speed_boosts(player_pos)
         self._add_red_tiles(player_pos)
         
+        if door_pos is None:
+            door_pos = self._find_door_position(player_pos)
+        
         return {
             'grid': self.grid,
             'teleporters': self.teleporters,
             'speed_boosts': self.speed_boosts,
             'red_tiles': self.red_tiles,
             'walls': self.walls,
+            'player_pos': list(player_pos),
+            'door_pos': door_pos,
             'current_rule': current_rule
         }
     
+    def iter_levels(self, start: int = 1, player_pos: List[int] = None) -> Iterator[dict]:
+        """Lazily yield levels start, start+1, ... of this campaign without end"""
+        if player_pos is None:
+            player_pos = [0, 0]
+        
+        level = start
+        while True:
+            yield self.generate_level(level, list(player_pos))
+            level += 1
+    
+    def rng_for_level(self, level: int, stream: str = "layout") -> random.Random:
+        """Get an independent RNG for one stream of one level of this campaign"""
+        key = f"{self.campaign_seed}:{level}:{stream}".encode()
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        return random.Random(int.from_bytes(digest, 'big'))
+    
     def _reset_level(self):
         """Reset all level data"""
         self.grid = []
@@ -57,21 +89,21 @@ class LevelGenerator:
             RuleType.TILES_TURN_RED
         ]
         
-        random.seed(level)
-        return random.choice(rules)
+        # Seed a private RNG with the level so the global RNG is never touched
+        return random.Random(level).choice(rules)
     
     def _add_walls(self, player_pos: List[int]):
         """Add walls that block movement (10-15 tiles max)"""
-        num_walls = random.randint(MIN_WALLS, MAX_WALLS)
+        num_walls = self.rng.randint(MIN_WALLS, MAX_WALLS)
         for _ in range(num_walls):
-            x, y = random.randint(0, TILE_WIDTH-1), random.randint(0, TILE_HEIGHT-1)
+            x, y = self.rng.randint(0, TILE_WIDTH-1), self.rng.randint(0, TILE_HEIGHT-1)
             if [x, y] != player_pos and self.grid[y][x] == TILE_EMPTY:
                 self.walls.append([x, y])
                 self.grid[y][x] = TILE_WALL
     
     def _add_teleporters(self, player_pos: List[int]):
         """Add teleporter pairs (4-8 tiles max, must be even number)"""
-        num_teleporters = random.randint(MIN_TELEPORTERS, MAX_TELEPORTERS)
+        num_teleporters = self.rng.randint(MIN_TELEPORTERS, MAX_TELEPORTERS)
         # Ensure even number
         if num_teleporters % 2 != 0:
             num_teleporters -= 1
@@ -80,13 +112,13 @@ class LevelGenerator:
         for _ in range(num_pairs):
             # Find first teleporter position
             while True:
-                x1, y1 = random.randint(0, TILE_WIDTH-1), random.randint(0, TILE_HEIGHT-1)
+                x1, y1 = self.rng.randint(0, TILE_WIDTH-1), self.rng.randint(0, TILE_HEIGHT-1)
                 if [x1, y1] != player_pos and self.grid[y1][x1] == TILE_EMPTY:
                     break
             
             # Find second teleporter position
             while True:
-                x2, y2 = random.randint(0, TILE_WIDTH-1), random.randint(0, TILE_HEIGHT-1)
+                x2, y2 = self.rng.randint(0, TILE_WIDTH-1), self.rng.randint(0, TILE_HEIGHT-1)
                 if [x2, y2] != player_pos and [x2, y2] != [x1, y1] and self.grid[y2][x2] == TILE_EMPTY:
                     break
             
@@ -96,19 +128,35 @@ class LevelGenerator:
     
     def _add_speed_boosts(self, player_pos: List[int]):
         """Add speed boost tiles (5-7 tiles max)"""
-        num_boosts = random.randint(MIN_SPEED_BOOSTS, MAX_SPEED_BOOSTS)
+        num_boosts = self.rng.randint(MIN_SPEED_BOOSTS, MAX_SPEED_BOOSTS)
         for _ in range(num_boosts):
-            x, y = random.randint(0, TILE_WIDTH-1), random.randint(0, TILE_HEIGHT-1)
+            x, y = self.rng.randint(0, TILE_WIDTH-1), self.rng.randint(0, TILE_HEIGHT-1)
             if [x, y] != player_pos and self.grid[y][x] == TILE_EMPTY:
                 self.speed_boosts.append([x, y])
                 self.grid[y][x] = TILE_SPEED_BOOST
     
     def _add_red_tiles(self, player_pos: List[int]):
         """Add red tiles (10-15 tiles max)"""
-        num_red = random.randint(MIN_RED_TILES, MAX_RED_TILES)
+        num_red = self.rng.randint(MIN_RED_TILES, MAX_RED_TILES)
         for _ in range(num_red):
-            x, y = random.randint(0, TILE_WIDTH-1), random.randint(0, TILE_HEIGHT-1)
+            x, y = self.rng.randint(0, TILE_WIDTH-1), self.rng.randint(0, TILE_HEIGHT-1)
             if [x, y] != player_pos and self.grid[y][x] == TILE_EMPTY:
                 self.red_tiles.append([x, y])
 
-                self.grid[y][x] = TILE_RED 
+                self.grid[y][x] = TILE_RED
+    
+    def _find_door_position(self, player_pos: List[int]) -> List[int]:
+        """Find a door position on an empty tile in the bottom-right area"""
+        for _ in range(100):
+            x = self.rng.randint(DOOR_MIN_COORD, TILE_WIDTH-1)
+            y = self.rng.randint(DOOR_MIN_COORD, TILE_HEIGHT-1)
+            if [x, y] != player_pos and self.grid[y][x] == TILE_EMPTY:
+                return [x, y]
+        
+        # If no valid position found, find the first empty tile
+        for y in range(TILE_HEIGHT):
+            for x in range(TILE_WIDTH):
+                if [x, y] != player_pos and self.grid[y][x] == TILE_EMPTY:
+                    return [x, y]
+        
+        return [TILE_WIDTH-1, TILE_HEIGHT-1] 
@@ -0,0 +1,126 @@
+import os
+import random
+import struct
+from typing import Dict, List, Optional
+from .constants import *
+
+MASK_64 = (1 << 64) - 1
+CELLS = TILE_WIDTH * TILE_HEIGHT
+
+# Fixed Zobrist keys so fingerprints are stable between runs and machines. Empty tiles
+# have key 0, so a level's fingerprint only depends on what was placed on it.
+_keys = random.Random(ZOBRIST_SEED)
+TILE_KEYS = [[0] + [_keys.getrandbits(64) for _ in range(1, 1 << TILE_BITS)] for _ in range(CELLS)]
+PLAYER_KEYS = [_keys.getrandbits(64) for _ in range(CELLS)]
+DOOR_KEYS = [_keys.getrandbits(64) for _ in range(CELLS)]
+PAIR_SALT = _keys.getrandbits(64)
+del _keys
+
+
+def tile_key(x: int, y: int, tile_type: int) -> int:
+    """Get the Zobrist key of a tile type on a cell"""
+    return TILE_KEYS[y * TILE_WIDTH + x][tile_type]
+
+
+def player_key(pos: List[int]) -> int:
+    """Get the Zobrist key of the player standing on a cell"""
+    return PLAYER_KEYS[pos[1] * TILE_WIDTH + pos[0]]
+
+
+def door_key(pos: List[int]) -> int:
+    """Get the Zobrist key of the door standing on a cell"""
+    return DOOR_KEYS[pos[1] * TILE_WIDTH + pos[0]]
+
+
+def pair_key(first: List[int], second: List[int]) -> int:
+    """Get the key of a teleporter pair, the same whichever end is listed first"""
+    a = first[1] * TILE_WIDTH + first[0]
+    b = second[1] * TILE_WIDTH + second[0]
+    if a > b:
+        a, b = b, a
+    
+    # splitmix64 finaliser over the pair's cells
+    value = (PAIR_SALT + a * CELLS + b) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+def level_hash(grid: List[List[int]], player_pos: List[int], door_pos: List[int], teleporters: List) -> int:
+    """Get the 64-bit fingerprint of a layout
+    
+    Tiles, player, door and teleporter pairs are XORed together, so the fingerprint does
+    not depend on the order pairs are stored in and can be updated one change at a time.
+    """
+    fingerprint = player_key(player_pos) ^ door_key(door_pos)
+    for y, row in enumerate(grid):
+        for x, tile_type in enumerate(row):
+            if tile_type:
+                fingerprint ^= TILE_KEYS[y * TILE_WIDTH + x][tile_type]
+    for first, second in teleporters:
+        fingerprint ^= pair_key(first, second)
+    return fingerprint
+
+
+def level_data_hash(level_data: Dict) -> int:
+    """Get the fingerprint of a level dict as returned by LevelLoader or LevelGenerator"""
+    return level_hash(level_data['grid'], level_data['player_pos'], level_data['door_pos'],
+                      level_data['teleporters'])
+
+
+class LevelIndex:
+    """Persistent set of level fingerprints for spotting duplicate layouts in O(1)
+    
+    Fingerprints are kept in memory as a set and appended to the index file as 8-byte
+    little-endian records the moment they are added, so the index survives crashes
+    without rewrites and reads the same on every machine.
+    """
+    
+    RECORD = struct.Struct('<Q')
+    
+    def __init__(self, path: Optional[str] = LEVEL_INDEX_FILE):
+        self.path = path
+        self.fingerprints = set()
+        if path is not None and os.path.exists(path):
+            self._load()
+    
+    def __contains__(self, fingerprint: int) -> bool:
+        return fingerprint in self.fingerprints
+    
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+    
+    def seen(self, level_data: Dict) -> bool:
+        """Check if a level's layout is already in the index"""
+        return level_data_hash(level_data) in self.fingerprints
+    
+    def add(self, level_data: Dict) -> bool:
+        """Add a level's layout, returning False if it was already in the index"""
+        return self.add_fingerprint(level_data_hash(level_data))
+    
+    def add_fingerprint(self, fingerprint: int) -> bool:
+        """Add a fingerprint, returning False if it was already in the index"""
+        if fingerprint in self.fingerprints:
+            return False
+        
+        self.fingerprints.add(fingerprint)
+        if self.path is not None:
+            try:
+                with open(self.path, 'ab') as file:
+                    file.write(self.RECORD.pack(fingerprint))
+            except OSError as e:
+                print(f"Error writing level index: {e}")
+        return True
+    
+    def _load(self):
+        """Read every complete record from the index file"""
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError as e:
+            print(f"Error reading level index: {e}")
+            return
+        
+        # A record cut short by a crash is ignored
+        usable = len(data) - len(data) % self.RECORD.size
+        self.fingerprints.update(fingerprint for fingerprint, in self.RECORD.iter_unpack(data[:usable]))
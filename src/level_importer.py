@@ -0,0 +1,153 @@
+import os
+import tarfile
+import zipfile
+from typing import Dict, Iterator, List, Tuple
+from .constants import *
+from .level_loader import LevelLoader
+
+class ValidationReport:
+    """Collects the problems found while importing a batch of level files"""
+    
+    def __init__(self):
+        self.levels_checked = 0
+        self.levels_valid = 0
+        self.issues = []
+        self.counts = {}
+    
+    def add_issue(self, source: str, code: str, message: str):
+        """Record one problem with a level"""
+        self.issues.append((source, code, message))
+        self.counts[code] = self.counts.get(code, 0) + 1
+    
+    def is_valid(self) -> bool:
+        """Check if every imported level passed validation"""
+        return not self.issues
+    
+    def summary(self) -> str:
+        """Get a one-line summary of the report"""
+        if not self.issues:
+            return f"{self.levels_checked} levels checked, all valid"
+        counts = ", ".join(f"{code}: {count}" for code, count in sorted(self.counts.items()))
+        return (f"{self.levels_checked} levels checked, {self.levels_valid} valid, "
+                f"{len(self.issues)} issues ({counts})")
+
+
+class LevelImporter:
+    """Streams level files from directories or archives and validates them in bulk"""
+    
+    ARCHIVE_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+    
+    def __init__(self, level_loader: LevelLoader = None):
+        self.level_loader = level_loader or LevelLoader()
+        self.report = ValidationReport()
+    
+    def iter_levels(self, path: str) -> Iterator[Tuple[str, Dict]]:
+        """Yield (source, level_data) for every valid level under a directory or archive
+        
+        Each call starts a fresh report in self.report.
+        """
+        self.report = ValidationReport()
+        for source, text in self.iter_sources(path):
+            level_data = self._import_level(source, text)
+            if level_data is not None:
+                yield source, level_data
+    
+    def import_levels(self, path: str) -> Tuple[List[Tuple[str, Dict]], ValidationReport]:
+        """Load every valid level under a path and return them with the validation report"""
+        levels = list(self.iter_levels(path))
+        return levels, self.report
+    
+    def validate(self, path: str) -> ValidationReport:
+        """Validate every level under a path without keeping the parsed levels"""
+        for _ in self.iter_levels(path):
+            pass
+        return self.report
+    
+    def iter_sources(self, path: str) -> Iterator[Tuple[str, str]]:
+        """Yield (source, text) for every .txt level file under a directory, zip or tar archive"""
+        if os.path.isdir(path):
+            yield from self._iter_directory(path)
+        elif zipfile.is_zipfile(path):
+            yield from self._iter_zip(path)
+        elif path.endswith(self.ARCHIVE_SUFFIXES) or tarfile.is_tarfile(path):
+            yield from self._iter_tar(path)
+        else:
+            with open(path, 'r', errors='replace') as file:
+                yield path, file.read()
+    
+    def _iter_directory(self, path: str) -> Iterator[Tuple[str, str]]:
+        """Yield level files from a directory tree in name order"""
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.txt'):
+                    filename = os.path.join(root, name)
+                    with open(filename, 'r', errors='replace') as file:
+                        yield filename, file.read()
+    
+    def _iter_zip(self, path: str) -> Iterator[Tuple[str, str]]:
+        """Yield level files from a zip archive"""
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.endswith('.txt'):
+                    text = archive.read(info).decode('utf-8', 'replace')
+                    yield f"{path}:{info.filename}", text
+    
+    def _iter_tar(self, path: str) -> Iterator[Tuple[str, str]]:
+        """Yield level files from a tar archive, reading members as they stream past"""
+        with tarfile.open(path, 'r|*') as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith('.txt'):
+                    text = archive.extractfile(member).read().decode('utf-8', 'replace')
+                    yield f"{path}:{member.name}", text
+    
+    def _import_level(self, source: str, text: str):
+        """Parse and validate one level, returning None if it cannot be used"""
+        self.report.levels_checked += 1
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        
+        try:
+            level_data = self.level_loader._parse_level_file(lines)
+        except ValueError as e:
+            self.report.add_issue(source, 'bad_dimensions', f"{e}: {len(lines)} non-empty lines")
+            return None
+        
+        if not self._validate_level(source, lines, level_data):
+            return None
+        self.report.levels_valid += 1
+        return level_data
+    
+    def _validate_level(self, source: str, lines: List[str], level_data: Dict) -> bool:
+        """Check a parsed level against the raw file lines"""
+        issues_before = len(self.report.issues)
+        grid = level_data['grid']
+        
+        # Rows must be exactly TILE_WIDTH characters
+        for y in range(TILE_HEIGHT):
+            if len(lines[y]) != TILE_WIDTH:
+                self.report.add_issue(source, 'bad_dimensions',
+                                      f"row {y} has {len(lines[y])} tiles, expected {TILE_WIDTH}")
+                break
+        
+        teleporter_count = sum(row.count(TILE_TELEPORTER) for row in grid)
+        if teleporter_count % 2 != 0:
+            self.report.add_issue(source, 'odd_teleporters',
+                                  f"{teleporter_count} teleporters cannot be paired")
+        
+        # The loader silently relocates a bad door, so check the position as written
+        door_x, door_y = self.level_loader._parse_position(lines[TILE_HEIGHT + 1])
+        if not (0 <= door_x < TILE_WIDTH and 0 <= door_y < TILE_HEIGHT):
+            self.report.add_issue(source, 'door_not_empty', f"door {door_x},{door_y} is off the grid")
+        elif grid[door_y][door_x] != TILE_EMPTY:
+            self.report.add_issue(source, 'door_not_empty',
+                                  f"door {door_x},{door_y} is on tile type {grid[door_y][door_x]}")
+        elif [door_x, door_y] == level_data['player_pos']:
+            self.report.add_issue(source, 'door_on_player', f"door {door_x},{door_y} is on the player's start")
+        
+        player_x, player_y = level_data['player_pos']
+        if not (0 <= player_x < TILE_WIDTH and 0 <= player_y < TILE_HEIGHT):
+            self.report.add_issue(source, 'player_on_wall', f"player {player_x},{player_y} is off the grid")
+        elif grid[player_y][player_x] == TILE_WALL:
+            self.report.add_issue(source, 'player_on_wall', f"player {player_x},{player_y} is on a wall")
+        
+        return len(self.report.issues) == issues_before
@@ -1,20 +1,26 @@
 import os
 from typing import List, Dict, Optional
 from .constants import *
+from .level_hash import level_hash
 from .sprite import Sprite
+from .tracing import traced
 
 class LevelLoader:
     """Handles loading levels from .txt files"""
     
-    def __init__(self):
-        self.levels_dir = "levels"
+    def __init__(self, levels_dir: str = "levels"):
+        self.levels_dir = levels_dir
         self._ensure_levels_directory()
+        
+        # Byte -> tile type table so whole rows are translated in one call
+        self.tile_table = bytes(self._char_to_tile_type(chr(i)) for i in range(256))
     
     def _ensure_levels_directory(self):
         """Ensure the levels directory exists"""
         if not os.path.exists(self.levels_dir):
             os.makedirs(self.levels_dir)
     
+    @traced(category="load")
     def load_level_from_file(self, level_number: int) -> Optional[Dict]:
         """Load a level from a .txt file"""
         filename = os.path.join(self.levels_dir, f"level_{level_number}.txt")
@@ -53,64 +59,52 @@ class LevelLoader:
         if len(lines) < TILE_HEIGHT + 2:  
             raise ValueError("Invalid level file format")
         
-        # Parse grid (first TILE_HEIGHT lines)
+        # Parse grid (first TILE_HEIGHT lines), translating each row in one pass
+        teleporter_positions = []
+        padding = bytes(TILE_WIDTH)
         for y in range(TILE_HEIGHT):
-            if y >= len(lines):
-                break
+            row = lines[y].encode('latin-1', 'replace')[:TILE_WIDTH].translate(self.tile_table)
+            if len(row) < TILE_WIDTH:
+                row += padding[len(row):]
             
-            row = lines[y]
-            grid_row = []
+            level_data['grid'].append(list(row))
             
-            for x in range(TILE_WIDTH):
-                if x >= len(row):
-                    grid_row.append(TILE_EMPTY)
-                else:
-                    tile_char = row[x]
-                    tile_type = self._char_to_tile_type(tile_char)
-                    grid_row.append(tile_type)
-                    
-                    # Track special tiles
-                    if tile_type == TILE_WALL:
-                        level_data['walls'].append([x, y])
-                    elif tile_type == TILE_TELEPORTER:
-                        # Teleporters will be paired later
-                        pass
-                    elif tile_type == TILE_SPEED_BOOST:
-                        level_data['speed_boosts'].append([x, y])
-                    elif tile_type == TILE_RED:
-                        level_data['red_tiles'].append([x, y])
-            
-            level_data['grid'].append(grid_row)
+            # Track special tiles
+            if TILE_WALL in row:
+                self._collect_positions(row, TILE_WALL, y, level_data['walls'])
+            if TILE_TELEPORTER in row:
+                self._collect_positions(row, TILE_TELEPORTER, y, teleporter_positions)
+            if TILE_SPEED_BOOST in row:
+                self._collect_positions(row, TILE_SPEED_BOOST, y, level_data['speed_boosts'])
+            if TILE_RED in row:
+                self._collect_positions(row, TILE_RED, y, level_data['red_tiles'])
         
         # Parse player position (line after grid)
-        if len(lines) > TILE_HEIGHT:
-            player_line = lines[TILE_HEIGHT]
-            level_data['player_pos'] = self._parse_position(player_line)
+        player_line = lines[TILE_HEIGHT]
+        level_data['player_pos'] = self._parse_position(player_line)
         
         # Parse door position (line after player)
-        if len(lines) > TILE_HEIGHT + 1:
-            door_line = lines[TILE_HEIGHT + 1]
-            door_pos = self._parse_position(door_line)
-            # Validate door position to ensure it's on an empty tile
-            level_data['door_pos'] = self._validate_door_position(door_pos, level_data['grid'], level_data['player_pos'])
+        door_line = lines[TILE_HEIGHT + 1]
+        door_pos = self._parse_position(door_line)
+        # Validate door position to ensure it's on an empty tile
+        level_data['door_pos'] = self._validate_door_position(door_pos, level_data['grid'], level_data['player_pos'])
         
-        # Parse teleporters (remaining lines)
-        teleporter_positions = []
-        for y in range(TILE_HEIGHT):
-            for x in range(TILE_WIDTH):
-                if level_data['grid'][y][x] == TILE_TELEPORTER:
-                    teleporter_positions.append([x, y])
-        
-        # Pair teleporters
-        for i in range(0, len(teleporter_positions), 2):
-            if i + 1 < len(teleporter_positions):
-                level_data['teleporters'].append([
-                    teleporter_positions[i],
-                    teleporter_positions[i + 1]
-                ])
+        # Pair teleporters in reading order
+        for i in range(0, len(teleporter_positions) - 1, 2):
+            level_data['teleporters'].append([
+                teleporter_positions[i],
+                teleporter_positions[i + 1]
+            ])
         
         return level_data
     
+    def _collect_positions(self, row: bytes, tile_type: int, y: int, positions: List[List[int]]):
+        """Append the position of every tile of the given type in a translated row"""
+        x = row.find(tile_type)
+        while x != -1:
+            positions.append([x, y])
+            x = row.find(tile_type, x + 1)
+    
     def _char_to_tile_type(self, char: str) -> int:
         """Convert character to tile type"""
         char = char.upper()
@@ -137,10 +131,18 @@ class LevelLoader:
             print(f"Error parsing position '{line}': {e}")
         return [0, 0]
     
-    def save_level_to_file(self, level_number: int, level_data: Dict):
-        """Save a level to a .txt file"""
+    def save_level_to_file(self, level_number: int, level_data: Dict, index=None) -> bool:
+        """Save a level to a .txt file, unless a LevelIndex is given that already holds its layout"""
         filename = os.path.join(self.levels_dir, f"level_{level_number}.txt")
         
+        if index is not None:
+            # Files keep only the teleporter tiles, which are paired in reading order on load
+            fingerprint = level_hash(level_data['grid'], level_data['player_pos'], level_data['door_pos'],
+                                     self._pair_in_reading_order(level_data['grid']))
+            if fingerprint in index:
+                print(f"Level {level_number} duplicates a level already in the index, not saved")
+                return False
+        
         try:
             with open(filename, 'w') as file:
                 # Write grid
@@ -160,6 +162,17 @@ class LevelLoader:
                 
         except Exception as e:
             print(f"Error saving level {level_number}: {e}")
+            return False
+        
+        if index is not None:
+            index.add_fingerprint(fingerprint)
+        return True
+    
+    def _pair_in_reading_order(self, grid: List[List[int]]) -> List:
+        """Pair a grid's teleporter tiles the way _parse_level_file does"""
+        positions = [[x, y] for y, row in enumerate(grid) for x, tile_type in enumerate(row)
+                     if tile_type == TILE_TELEPORTER]
+        return [[positions[i], positions[i + 1]] for i in range(0, len(positions) - 1, 2)]
     
     def _tile_type_to_char(self, tile_type: int) -> str:
         """Convert tile type to character"""
@@ -180,32 +193,13 @@ class LevelLoader:
         """Validate and potentially correct door position to ensure it's on an empty tile"""
         x, y = door_pos
         
-        # Check bounds
-        if x < 0 or x >= TILE_WIDTH or y < 0 or y >= TILE_HEIGHT:
-            # Find first empty tile
-            for y2 in range(TILE_HEIGHT):
-                for x2 in range(TILE_WIDTH):
-                    if grid[y2][x2] == TILE_EMPTY and [x2, y2] != player_pos:
-                        return [x2, y2]
-            return [0, 0]  # Fallback
+        if (0 <= x < TILE_WIDTH and 0 <= y < TILE_HEIGHT and
+                door_pos != player_pos and grid[y][x] == TILE_EMPTY):
+            return door_pos
         
-        # Check if it's not the player position
-        if door_pos == player_pos:
-            # Find first empty tile
-            for y2 in range(TILE_HEIGHT):
-                for x2 in range(TILE_WIDTH):
-                    if grid[y2][x2] == TILE_EMPTY and [x2, y2] != player_pos:
-                        return [x2, y2]
-            return [0, 0]  # Fallback
-        
-        # Check if it's an empty tile
-        if grid[y][x] != TILE_EMPTY:
-            # Find first empty tile
-            for y2 in range(TILE_HEIGHT):
-                for x2 in range(TILE_WIDTH):
-                    if grid[y2][x2] == TILE_EMPTY and [x2, y2] != player_pos:
-                        return [x2, y2]
-            return [0, 0]  # Fallback
-        
-
-        return door_pos 
+        # Find first empty tile
+        for y2, row in enumerate(grid):
+            for x2, tile_type in enumerate(row):
+                if tile_type == TILE_EMPTY and [x2, y2] != player_pos:
+                    return [x2, y2]
+        return [0, 0]  # Fallback
@@ -0,0 +1,89 @@
+import numpy as np
+from .constants import *
+
+class PixelObserver:
+    """Renders the board off-screen into a preallocated RGB array for learning agents
+    
+    Tiles are kept as palette indices and only the tiles that changed since the last
+    observation are rewritten; colours come from one palette lookup and are expanded
+    to tile_pixels x tile_pixels blocks in place, so observing allocates nothing.
+    """
+    
+    DOOR_INDEX = 6
+    PLAYER_INDEX = 7
+    
+    def __init__(self, tile_pixels: int = 1, width: int = TILE_WIDTH, height: int = TILE_HEIGHT):
+        if tile_pixels < 1:
+            raise ValueError("tile_pixels must be at least 1")
+        self.tile_pixels = tile_pixels
+        self.width = width
+        self.height = height
+        
+        # Palette index = tile type, plus entries for the door and player overlays
+        self.palette = np.array([
+            WHITE,   # TILE_EMPTY
+            GRAY,    # TILE_WALL
+            PURPLE,  # TILE_TELEPORTER
+            ORANGE,  # TILE_SPEED_BOOST
+            RED,     # TILE_RED
+            WHITE,   # TILE_DOOR
+            BROWN,   # door overlay
+            BLUE     # player overlay
+        ], dtype=np.uint8)
+        
+        self.tiles = np.zeros((height, width), dtype=np.uint8)
+        self.indices = np.zeros((height, width), dtype=np.uint8)
+        self.colors = np.zeros((height, width, 3), dtype=np.uint8)
+        if tile_pixels == 1:
+            self.frame = self.colors
+        else:
+            self.frame = np.zeros((height * tile_pixels, width * tile_pixels, 3), dtype=np.uint8)
+        self.blocks = self.frame.reshape(height, tile_pixels, width, tile_pixels, 3)
+        
+        # Epochs restart with every GameState, so the base grid object is checked too
+        self.synced_epoch = None
+        self.synced_base = None
+        self.synced_changes = 0
+    
+    def observe(self, game_state) -> np.ndarray:
+        """Render a GameState and return the (reused) RGB frame"""
+        return self._render(
+            game_state.level_epoch,
+            game_state.base_grid,
+            game_state.changed_tiles,
+            game_state.player_pos,
+            game_state.door_pos
+        )
+    
+    def observe_snapshot(self, snapshot) -> np.ndarray:
+        """Render a StateSnapshot and return the (reused) RGB frame"""
+        return self._render(
+            snapshot.epoch,
+            snapshot.base_grid,
+            snapshot.changed_tiles,
+            snapshot.player_pos,
+            snapshot.door_pos
+        )
+    
+    def _render(self, epoch: int, base_grid, changed_tiles, player_pos, door_pos) -> np.ndarray:
+        """Sync tile indices, overlay door and player and expand to pixels"""
+        if epoch != self.synced_epoch or base_grid is not self.synced_base:
+            # A new or reset level: the only full copy, once per level
+            self.tiles[...] = base_grid
+            self.synced_epoch = epoch
+            self.synced_base = base_grid
+            self.synced_changes = 0
+        
+        for i in range(self.synced_changes, len(changed_tiles)):
+            x, y, tile_type = changed_tiles[i]
+            self.tiles[y, x] = tile_type
+        self.synced_changes = len(changed_tiles)
+        
+        np.copyto(self.indices, self.tiles)
+        self.indices[door_pos[1], door_pos[0]] = self.DOOR_INDEX
+        self.indices[player_pos[1], player_pos[0]] = self.PLAYER_INDEX
+        
+        np.take(self.palette, self.indices, axis=0, out=self.colors)
+        if self.tile_pixels > 1:
+            self.blocks[...] = self.colors[:, None, :, None, :]
+        return self.frame
@@ -1,6 +1,7 @@
 from typing import List, Tuple
 from .constants import *
 from .enums import RuleType
+from .tracing import traced
 
 class Player:
     """Handles player movement and interactions with special tiles"""
@@ -14,6 +15,7 @@ class Player:
         self.position = [0, 0]
         self.color = BLUE
     
+    @traced(category="move")
     def move(self, dx: int, dy: int, game_state) -> bool:
         """Move the player and handle special tile interactions"""
         # Check for movement restrictions
@@ -33,6 +35,7 @@ class Player:
         
         # Check red tiles (if player steps on red tile, level restarts)
         if game_state.grid[new_y][new_x] == TILE_RED:
+            game_state.telemetry.record('red_tile_death', game_state.level, new_x, new_y, game_state.moves)
             game_state.reset_level()
             self.reset()
             return False
@@ -41,6 +44,7 @@ class Player:
         self.position = [new_x, new_y]
         game_state.update_player_position(self.position)
         game_state.increment_moves()
+        game_state.telemetry.record('move', game_state.level, new_x, new_y, game_state.moves)
         
         # Handle special tiles
         tile_type = game_state.grid[new_y][new_x]
@@ -52,19 +56,23 @@ class Player:
         
         return True
     
+    @traced(category="move")
     def _handle_teleporter(self, game_state):
         """Handle teleporter mechanics"""
         current_pos = self.position.copy()
         for pair in game_state.teleporters:
             if current_pos == pair[0]:
                 self.position = pair[1].copy()
-                game_state.update_player_position(self.position)
-                break
             elif current_pos == pair[1]:
                 self.position = pair[0].copy()
-                game_state.update_player_position(self.position)
-                break
+            else:
+                continue
+            game_state.update_player_position(self.position)
+            game_state.telemetry.record('teleport', game_state.level, current_pos[0], current_pos[1],
+                                        self.position[0], self.position[1])
+            break
     
+    @traced(category="move")
     def _handle_speed_boost(self, dx: int, dy: int, game_state):
         """Handle speed boost mechanics"""
         if dx != 0 or dy != 0:
@@ -77,6 +85,7 @@ class Player:
                 self.position = [new_x, new_y]
                 game_state.update_player_position(self.position)
                 game_state.increment_moves()
+                game_state.telemetry.record('speed_boost', game_state.level, new_x, new_y)
     
     def get_position(self) -> List[int]:
         """Get current player position"""
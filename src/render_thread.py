@@ -0,0 +1,37 @@
+import threading
+import time
+import pygame
+from .constants import *
+
+class RenderThread(threading.Thread):
+    """Draws the most recently published state snapshot at its own frame rate"""
+    
+    def __init__(self, renderer, input_handler, fps: int = FPS):
+        super().__init__(name="trium-render", daemon=True)
+        self.renderer = renderer
+        self.input_handler = input_handler
+        self.fps = fps
+        self.snapshot = None
+        self._stop_event = threading.Event()
+    
+    def publish(self, snapshot):
+        """Make a snapshot the latest one to draw (a single reference swap, no lock)"""
+        self.snapshot = snapshot
+    
+    def run(self):
+        clock = pygame.time.Clock()
+        drawn = None
+        
+        while not self._stop_event.is_set():
+            snapshot = self.snapshot
+            if snapshot is not None and snapshot is not drawn:
+                self.renderer.render_snapshot(snapshot)
+                self.input_handler.mark_presented(time.perf_counter(), snapshot.input_seq)
+                drawn = snapshot
+            clock.tick(self.fps)
+    
+    def stop(self):
+        """Stop rendering and wait for the current frame to finish"""
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
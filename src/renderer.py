@@ -1,6 +1,9 @@
 import pygame
-from typing import List
+from typing import List, Optional
 from .constants import *
+from .snapshot import StateSnapshot
+from .sprite import Sprite
+from .tracing import traced
 
 class Renderer:
     """Handles all drawing and visual rendering of the game"""
@@ -9,14 +12,52 @@ class Renderer:
         self.screen = screen
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        
+        # The board is an 8-bit surface with one pixel per tile whose palette index is the
+        # tile type, backed by a buffer the renderer owns and scaled up only when a tile changes
+        self.board_tiles = bytearray(TILE_WIDTH * TILE_HEIGHT)
+        self.board = pygame.image.frombuffer(self.board_tiles, (TILE_WIDTH, TILE_HEIGHT), 'P')
+        self.board.set_palette([self._get_tile_color(tile_type) for tile_type in range(TILE_TYPES)])
+        self.board_surface = None
+        self.grid_lines = self._build_grid_lines()
+        
+        # Renderer-owned sprites, updated from snapshots instead of shared game state
+        self.door_sprite = Sprite(0, 0, SPRITE_DOOR, BROWN, DOOR_SIZE)
+        self.player_sprite = Sprite(0, 0, SPRITE_PLAYER, BLUE, PLAYER_SIZE)
+        
+        # Which level epoch and how many tile changes the board reflects
+        self.synced_epoch = None
+        self.synced_changes = 0
+        
+        # Aggregated run heatmap, drawn as one pre-scaled overlay surface per level
+        self.heatmap = None
+        self.show_heatmap = False
+        self.heatmap_surfaces = {}
+    
+    def set_heatmap(self, heatmap):
+        """Use a Heatmap for the overlay, dropping overlays built from the previous one"""
+        self.heatmap = heatmap
+        self.heatmap_surfaces = {}
+    
+    def toggle_heatmap(self) -> bool:
+        """Show or hide the heatmap overlay, returning whether it is now shown"""
+        self.show_heatmap = not self.show_heatmap and self.heatmap is not None
+        return self.show_heatmap
     
-    def render(self, game_state, player):
+    def render(self, game_state):
         """Render the complete game"""
+        self.render_snapshot(game_state.snapshot())
+    
+    @traced(category="render")
+    def render_snapshot(self, snapshot: StateSnapshot):
+        """Render the complete game from a state snapshot"""
         self._clear_screen()
-        self._draw_grid(game_state)
-        self._draw_door(game_state)
-        self._draw_player(game_state)
-        self._draw_ui(game_state, player)
+        self._draw_grid(snapshot)
+        self._draw_heatmap(snapshot)
+        self._draw_hint(snapshot)
+        self._draw_door(snapshot)
+        self._draw_player(snapshot)
+        self._draw_ui(snapshot)
         self._draw_instructions()
         self._draw_legend()
         pygame.display.flip()
@@ -25,20 +66,38 @@ class Renderer:
         """Clear the screen with white background"""
         self.screen.fill(WHITE)
     
-    def _draw_grid(self, game_state):
-        """Draw the game grid with all tiles using sprites"""
+    def _sync_tiles(self, snapshot: StateSnapshot):
+        """Bring the board pixels up to date with the snapshot"""
+        if snapshot.epoch != self.synced_epoch:
+            # A new level or a restart: take the whole board straight from the grid
+            self.board_tiles[:] = bytes(tile_type for row in snapshot.base_grid for tile_type in row)
+            self.board_surface = None
+            self.synced_epoch = snapshot.epoch
+            self.synced_changes = 0
+        
+        # Tile changes are append-only within an epoch, so only apply the new ones
+        for x, y, tile_type in snapshot.changed_tiles[self.synced_changes:]:
+            self.board.set_at((x, y), tile_type)
+            self.board_surface = None
+        self.synced_changes = len(snapshot.changed_tiles)
+    
+    def _draw_grid(self, snapshot: StateSnapshot):
+        """Draw the game grid as two blits: the scaled board and the cached grid lines"""
+        self._sync_tiles(snapshot)
+        if self.board_surface is None:
+            self.board_surface = pygame.transform.scale(self.board, (GRID_WIDTH, GRID_HEIGHT))
+        self.screen.blit(self.board_surface, (GRID_X, GRID_Y))
+        self.screen.blit(self.grid_lines, (GRID_X, GRID_Y))
+    
+    def _build_grid_lines(self) -> pygame.Surface:
+        """Build the tile borders once as a colour-keyed overlay, which blits faster than per-pixel alpha"""
+        lines = pygame.Surface((GRID_WIDTH, GRID_HEIGHT))
+        lines.fill(WHITE)
+        lines.set_colorkey(WHITE, pygame.RLEACCEL)
         for y in range(TILE_HEIGHT):
             for x in range(TILE_WIDTH):
-                if (x, y) in game_state.sprites:
-                    sprite = game_state.sprites[(x, y)]
-                    sprite.draw(self.screen)
-                else:
-                    # Fallback drawing for tiles without sprites
-                    rect = pygame.Rect(x * TILE_SIZE + GRID_X, y * TILE_SIZE + GRID_Y, TILE_SIZE, TILE_SIZE)
-                    tile_type = game_state.grid[y][x]
-                    color = self._get_tile_color(tile_type)
-                    pygame.draw.rect(self.screen, color, rect)
-                    pygame.draw.rect(self.screen, BLACK, rect, 1)
+                pygame.draw.rect(lines, BLACK, (x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE), 1)
+        return lines
     
     def _get_tile_color(self, tile_type: int) -> tuple:
         """Get color for tile type"""
@@ -53,31 +112,55 @@ class Renderer:
         else:
             return WHITE
     
-    def _draw_door(self, game_state):
+    def _draw_heatmap(self, snapshot: StateSnapshot):
+        """Blend the level's heatmap over the grid with a single blit"""
+        if not self.show_heatmap:
+            return
+        
+        if snapshot.level not in self.heatmap_surfaces:
+            self.heatmap_surfaces[snapshot.level] = self._build_heatmap_surface(snapshot.level)
+        surface = self.heatmap_surfaces[snapshot.level]
+        if surface is not None:
+            self.screen.blit(surface, (GRID_X, GRID_Y))
+    
+    def _build_heatmap_surface(self, level: int) -> Optional[pygame.Surface]:
+        """Build a level's overlay once: one RGBA pixel per tile, scaled up to the grid"""
+        colors = self.heatmap.colors(level)
+        if colors is None:
+            return None
+        tiles = pygame.image.frombuffer(colors.tobytes(), (TILE_WIDTH, TILE_HEIGHT), 'RGBA')
+        return pygame.transform.scale(tiles, (GRID_WIDTH, GRID_HEIGHT)).convert_alpha()
+    
+    def _draw_hint(self, snapshot: StateSnapshot):
+        """Outline the cells along the suggested path"""
+        for x, y in snapshot.hint_cells:
+            rect = pygame.Rect(x * TILE_SIZE + GRID_X + 4, y * TILE_SIZE + GRID_Y + 4, TILE_SIZE - 8, TILE_SIZE - 8)
+            pygame.draw.rect(self.screen, CYAN, rect, 3)
+    
+    def _draw_door(self, snapshot: StateSnapshot):
         """Draw the door using sprite"""
-        if 'door' in game_state.sprites:
-            door_sprite = game_state.sprites['door']
-            door_sprite.draw(self.screen)
-            
-            # Draw door handle
-            door_pos = game_state.door_pos
-            handle_rect = pygame.Rect(
-                door_pos[0] * TILE_SIZE + GRID_X + TILE_SIZE - 10,
-                door_pos[1] * TILE_SIZE + GRID_Y + TILE_SIZE // 2 - 5,
-                5, 10
-            )
-            pygame.draw.rect(self.screen, BLACK, handle_rect)
-    
-    def _draw_player(self, game_state):
+        door_pos = snapshot.door_pos
+        self.door_sprite.set_position(door_pos[0], door_pos[1])
+        self.door_sprite.draw(self.screen)
+        
+        # Draw door handle
+        handle_rect = pygame.Rect(
+            door_pos[0] * TILE_SIZE + GRID_X + TILE_SIZE - 10,
+            door_pos[1] * TILE_SIZE + GRID_Y + TILE_SIZE // 2 - 5,
+            5, 10
+        )
+        pygame.draw.rect(self.screen, BLACK, handle_rect)
+    
+    def _draw_player(self, snapshot: StateSnapshot):
         """Draw the player using sprite"""
-        if 'player' in game_state.sprites:
-            player_sprite = game_state.sprites['player']
-            player_sprite.draw(self.screen)
+        player_pos = snapshot.player_pos
+        self.player_sprite.set_position(player_pos[0], player_pos[1])
+        self.player_sprite.draw(self.screen)
     
-    def _draw_ui(self, game_state, player):
+    def _draw_ui(self, snapshot: StateSnapshot):
         """Draw the user interface elements"""
         # Level info - top left, above the grid
-        level_text = self.font.render(f"Level: {game_state.level}/{MAX_LEVELS}", True, BLACK)
+        level_text = self.font.render(f"Level: {snapshot.level}/{MAX_LEVELS}", True, BLACK)
         self.screen.blit(level_text, (20, 20))
         
         # Current rules - below level info
@@ -85,7 +168,7 @@ class Renderer:
             "Rules:",
             "1. Player cannot step on red tiles",
             "2. Maximum 100 moves per level",
-            f"3. {game_state.current_rule.value}"
+            f"3. {snapshot.current_rule.value}"
         ]
         
         y_offset = 60
@@ -95,8 +178,29 @@ class Renderer:
             y_offset += 25
         
         # Moves counter - below rules
-        moves_text = self.small_font.render(f"Moves: {game_state.moves}/{game_state.max_moves}", True, BLACK)
+        moves_text = self.small_font.render(f"Moves: {snapshot.moves}/{snapshot.max_moves}", True, BLACK)
         self.screen.blit(moves_text, (20, y_offset + 10))
+        
+        # Best score for this level and rule - below moves
+        if snapshot.best_moves is not None:
+            best_text = self.small_font.render(f"Best: {snapshot.best_moves} moves", True, BLACK)
+            self.screen.blit(best_text, (20, y_offset + 35))
+        
+        self._draw_leaderboard(snapshot)
+    
+    def _draw_leaderboard(self, snapshot: StateSnapshot):
+        """Draw the best finished games below the legend"""
+        if not snapshot.leaderboard:
+            return
+        
+        x_offset = WINDOW_WIDTH - 200
+        y_offset = 230
+        title_text = self.small_font.render("Leaderboard:", True, BLACK)
+        self.screen.blit(title_text, (x_offset, y_offset))
+        for rank, (levels_completed, total_moves, _) in enumerate(snapshot.leaderboard, 1):
+            y_offset += 25
+            entry_text = self.small_font.render(f"{rank}. {levels_completed} levels, {total_moves} moves", True, BLACK)
+            self.screen.blit(entry_text, (x_offset, y_offset))
     
     def _draw_instructions(self):
         """Draw game instructions"""
@@ -104,10 +208,12 @@ class Renderer:
             "Use WASD or Arrow Keys to move",
             "Reach the brown door to complete the level",
             "Don't step on red tiles!",
-            "Press R to restart level"
+            "Press R to restart level",
+            "Press H for a hint",
+            "Press M for the path heatmap"
         ]
         
-        y_offset = WINDOW_HEIGHT - 120
+        y_offset = WINDOW_HEIGHT - 145
         for instruction in instructions:
             instruction_text = self.small_font.render(instruction, True, BLACK)
             self.screen.blit(instruction_text, (20, y_offset))
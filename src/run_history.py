@@ -0,0 +1,155 @@
+import queue
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+from .constants import *
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS level_results (
+    id INTEGER PRIMARY KEY,
+    level INTEGER NOT NULL,
+    rule TEXT,
+    moves INTEGER NOT NULL,
+    restarts INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    completed INTEGER NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS level_results_best ON level_results (level, rule, completed, moves);
+CREATE INDEX IF NOT EXISTS level_results_best_any_rule ON level_results (level, completed, moves);
+
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    levels_completed INTEGER NOT NULL,
+    total_moves INTEGER NOT NULL,
+    total_restarts INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    won INTEGER NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_leaderboard ON games (levels_completed DESC, total_moves, duration_s);
+"""
+
+INSERT_LEVEL = """INSERT INTO level_results (level, rule, moves, restarts, duration_s, completed, finished_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)"""
+INSERT_GAME = """INSERT INTO games (levels_completed, total_moves, total_restarts, duration_s, won, finished_at)
+VALUES (?, ?, ?, ?, ?, ?)"""
+
+
+class RunHistory:
+    """Local SQLite store of finished levels and games, with best scores and a leaderboard
+    
+    Results are queued and written by a background thread in batched transactions, so
+    recording never waits on disk. The database runs in WAL mode, which lets the game
+    thread read while the writer commits; best-score and leaderboard lookups use
+    covering indexes and are cached, with new results folded into the cache directly.
+    """
+    
+    def __init__(self, path: str = RUN_HISTORY_FILE, flush_interval: float = RUN_HISTORY_FLUSH_INTERVAL_S):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.best_cache = {}
+        self.leaderboard_cache = None
+        
+        self.connection = self._connect()
+        self.connection.executescript(SCHEMA)
+        
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="trium-history", daemon=True)
+        self._thread.start()
+    
+    def record_level(self, level: int, rule, moves: int, restarts: int, duration: float, completed: bool):
+        """Queue the result of a finished level"""
+        rule_name = rule.name if rule is not None else None
+        self._queue.put((INSERT_LEVEL, (level, rule_name, moves, restarts, duration, int(completed), time.time())))
+        
+        # Fold the result into the cached bests now, as the row may not be written yet
+        if completed:
+            for key_rule in (rule, None):
+                best = self.best_moves(level, key_rule)
+                if best is None or moves < best:
+                    self.best_cache[(level, key_rule.name if key_rule is not None else None)] = moves
+    
+    def record_game(self, levels_completed: int, total_moves: int, total_restarts: int, duration: float, won: bool):
+        """Queue the result of a finished game"""
+        self._queue.put((INSERT_GAME, (levels_completed, total_moves, total_restarts, duration, int(won), time.time())))
+        
+        leaderboard = self.leaderboard()
+        leaderboard.append((levels_completed, total_moves, duration))
+        leaderboard.sort(key=lambda entry: (-entry[0], entry[1], entry[2]))
+        del leaderboard[RUN_HISTORY_LEADERBOARD_SIZE:]
+    
+    def best_moves(self, level: int, rule=None) -> Optional[int]:
+        """Get the fewest moves a level was completed in, optionally under one rule"""
+        rule_name = rule.name if rule is not None else None
+        key = (level, rule_name)
+        if key not in self.best_cache:
+            if rule is None:
+                row = self.connection.execute(
+                    "SELECT MIN(moves) FROM level_results WHERE level = ? AND completed = 1", (level,)
+                ).fetchone()
+            else:
+                row = self.connection.execute(
+                    "SELECT MIN(moves) FROM level_results WHERE level = ? AND rule = ? AND completed = 1",
+                    (level, rule_name)
+                ).fetchone()
+            self.best_cache[key] = row[0]
+        return self.best_cache[key]
+    
+    def leaderboard(self) -> List[Tuple[int, int, float]]:
+        """Get the best games as (levels completed, total moves, duration), best first"""
+        if self.leaderboard_cache is None:
+            self.leaderboard_cache = self.connection.execute(
+                "SELECT levels_completed, total_moves, duration_s FROM games "
+                "ORDER BY levels_completed DESC, total_moves, duration_s LIMIT ?",
+                (RUN_HISTORY_LEADERBOARD_SIZE,)
+            ).fetchall()
+        return self.leaderboard_cache
+    
+    def flush(self):
+        """Wait until every queued result has been written"""
+        self._queue.join()
+    
+    def close(self):
+        """Write what is queued and close the database"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self.connection.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection in WAL mode"""
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+    
+    def _run(self):
+        """Writer loop: gather queued rows and commit them in one transaction per batch"""
+        connection = self._connect()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not None and len(batch) < RUN_HISTORY_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            
+            # None is queued by close() after the last result
+            running = batch[-1] is not None
+            rows = batch if running else batch[:-1]
+            try:
+                with connection:
+                    for statement, values in rows:
+                        connection.execute(statement, values)
+            except sqlite3.Error as e:
+                print(f"Error writing run history: {e}")
+            for _ in batch:
+                self._queue.task_done()
+        connection.close()
@@ -0,0 +1,216 @@
+import os
+import struct
+import zlib
+from typing import List, Tuple
+from .constants import *
+from .enums import RULES
+from .telemetry import NULL_TELEMETRY
+
+NO_RULE = 255
+
+
+def pack_tiles(grid: List[List[int]]) -> bytes:
+    """Bit-pack a grid at TILE_BITS bits per tile, row-major"""
+    value = 0
+    shift = 0
+    for row in grid:
+        for tile_type in row:
+            value |= tile_type << shift
+            shift += TILE_BITS
+    return value.to_bytes((shift + 7) // 8, 'little')
+
+
+def unpack_tiles(data: bytes, width: int, height: int) -> List[List[int]]:
+    """Unpack a grid written by pack_tiles"""
+    value = int.from_bytes(data, 'little')
+    mask = (1 << TILE_BITS) - 1
+    grid = []
+    for _ in range(height):
+        row = []
+        for _ in range(width):
+            row.append(value & mask)
+            value >>= TILE_BITS
+        grid.append(row)
+    return grid
+
+
+class SaveGame:
+    """Saves and restores an in-progress session as a compact, versioned, checksummed record
+    
+    Layout (little-endian): header, teleporter pairs, bit-packed tiles, stepped-tile
+    bitmask, session totals (from version 2), then a CRC32 of everything before it.
+    """
+    
+    MAGIC = b'TRSV'
+    VERSION = 2
+    HEADER = struct.Struct('<4sBHBHHHHBBBBBBQBB')
+    PAIR = struct.Struct('<BBBB')
+    SESSION = struct.Struct('<IId')
+    CHECKSUM = struct.Struct('<I')
+    
+    def __init__(self, path: str = SAVE_FILE):
+        self.path = path
+        
+        # (moves, restarts, seconds played) of the finished levels in the loaded run
+        self.session = (0, 0, 0.0)
+    
+    def save(self, game_state, player, session: Tuple[int, int, float] = (0, 0, 0.0)):
+        """Write the session to disk, replacing any previous save atomically"""
+        temp_path = self.path + '.tmp'
+        try:
+            data = self.pack(game_state, player, session)
+            with open(temp_path, 'wb') as file:
+                file.write(data)
+            os.replace(temp_path, self.path)
+        except (OSError, struct.error) as e:
+            print(f"Error saving game: {e}")
+    
+    def load(self, game_state, player) -> bool:
+        """Restore the saved session into game_state and player if a valid save exists"""
+        if not os.path.exists(self.path):
+            return False
+        
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+            self.session = self.unpack(data, game_state, player)
+            return True
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Error loading saved game: {e}")
+            return False
+    
+    def delete(self):
+        """Remove the save, e.g. once the game has ended"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+    
+    def pack(self, game_state, player, session: Tuple[int, int, float] = (0, 0, 0.0)) -> bytes:
+        """Serialise a session to bytes"""
+        height = len(game_state.grid)
+        width = len(game_state.grid[0])
+        rule = RULES.index(game_state.current_rule) if game_state.current_rule in RULES else NO_RULE
+        
+        header = self.HEADER.pack(
+            self.MAGIC, self.VERSION,
+            game_state.level, rule,
+            game_state.moves, game_state.max_moves,
+            game_state.door_move_counter, min(game_state.restarts, 0xFFFF),
+            player.position[0], player.position[1],
+            game_state.door_pos[0], game_state.door_pos[1],
+            width, height,
+            game_state.level_generator.campaign_seed,
+            int(game_state.use_level_files),
+            len(game_state.teleporters)
+        )
+        
+        pairs = b''.join(
+            self.PAIR.pack(first[0], first[1], second[0], second[1])
+            for first, second in game_state.teleporters
+        )
+        
+        stepped = 0
+        for x, y in game_state.stepped_tiles:
+            stepped |= 1 << (y * width + x)
+        stepped_bytes = stepped.to_bytes((width * height + 7) // 8, 'little')
+        
+        session_moves, session_restarts, session_seconds = session
+        totals = self.SESSION.pack(min(session_moves, 0xFFFFFFFF), min(session_restarts, 0xFFFFFFFF),
+                                   session_seconds)
+        
+        body = header + pairs + pack_tiles(game_state.grid) + stepped_bytes + totals
+        return body + self.CHECKSUM.pack(zlib.crc32(body))
+    
+    def unpack(self, data: bytes, game_state, player) -> Tuple[int, int, float]:
+        """Restore a session from bytes and return its totals, raising ValueError if the record is unusable"""
+        if len(data) < self.HEADER.size + self.CHECKSUM.size:
+            raise ValueError("save file is truncated")
+        
+        body, checksum = data[:-self.CHECKSUM.size], data[-self.CHECKSUM.size:]
+        if zlib.crc32(body) != self.CHECKSUM.unpack(checksum)[0]:
+            raise ValueError("save file checksum mismatch")
+        
+        (magic, version, level, rule, moves, max_moves, door_move_counter, restarts,
+         player_x, player_y, door_x, door_y, width, height,
+         campaign_seed, use_level_files, pair_count) = self.HEADER.unpack_from(body)
+        if magic != self.MAGIC:
+            raise ValueError("not a Trium save file")
+        if version not in (1, self.VERSION):
+            raise ValueError(f"unsupported save version {version}")
+        if (width, height) != (TILE_WIDTH, TILE_HEIGHT):
+            raise ValueError(f"save is for a {width}x{height} grid")
+        if rule != NO_RULE and rule >= len(RULES):
+            raise ValueError(f"unknown rule {rule}")
+        
+        tile_bytes = (width * height * TILE_BITS + 7) // 8
+        stepped_bytes = (width * height + 7) // 8
+        size = self.HEADER.size + pair_count * self.PAIR.size + tile_bytes + stepped_bytes
+        if version >= 2:
+            size += self.SESSION.size
+        if len(body) != size:
+            raise ValueError("save file size does not match its header")
+        
+        offset = self.HEADER.size
+        teleporters = []
+        for _ in range(pair_count):
+            x1, y1, x2, y2 = self.PAIR.unpack_from(body, offset)
+            teleporters.append([[x1, y1], [x2, y2]])
+            offset += self.PAIR.size
+        
+        grid = unpack_tiles(body[offset:offset + tile_bytes], width, height)
+        offset += tile_bytes
+        stepped = int.from_bytes(body[offset:offset + stepped_bytes], 'little')
+        offset += stepped_bytes
+        
+        # Version 1 saves did not keep the session totals
+        session = (0, 0, 0.0)
+        if version >= 2:
+            session = self.SESSION.unpack_from(body, offset)
+        
+        positions = [[player_x, player_y], [door_x, door_y]]
+        positions.extend(position for pair in teleporters for position in pair)
+        if any(not (0 <= x < width and 0 <= y < height) for x, y in positions):
+            raise ValueError("save has a position outside the grid")
+        if any(tile_type > TILE_DOOR for row in grid for tile_type in row):
+            raise ValueError("save has an unknown tile type")
+        
+        # Everything is validated; rebuild the pristine level, then replay the differences onto it.
+        # The level start is recorded once the resumed level is live, with its saved rule
+        telemetry = game_state.telemetry
+        game_state.telemetry = NULL_TELEMETRY
+        try:
+            game_state.level = level
+            game_state.level_generator.campaign_seed = campaign_seed
+            game_state.use_level_files = bool(use_level_files)
+            game_state.generate_level()
+        finally:
+            game_state.telemetry = telemetry
+        
+        if rule != NO_RULE:
+            game_state.set_rule(RULES[rule])
+        game_state.teleporters = teleporters
+        game_state.moves = moves
+        game_state.max_moves = max_moves
+        game_state.door_move_counter = door_move_counter
+        game_state.restarts = restarts
+        game_state.stepped_tiles = {
+            (cell % width, cell // width)
+            for cell in range(width * height) if stepped >> cell & 1
+        }
+        
+        for y in range(height):
+            for x in range(width):
+                if grid[y][x] != game_state.grid[y][x]:
+                    game_state.set_tile(x, y, grid[y][x])
+        
+        game_state.set_door_position([door_x, door_y])
+        
+        # Place the player directly: update_player_position would step on the cell and,
+        # under TILES_TURN_RED, turn it red
+        player.position = [player_x, player_y]
+        game_state.player_pos = player.position
+        
+        # The rule or teleporters may differ from the regenerated level
+        game_state.rebuild_distance_field()
+        game_state.rehash()
+        game_state.telemetry.record('level_start', game_state.level, game_state.current_rule)
+        return session
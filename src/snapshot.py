@@ -0,0 +1,18 @@
+from typing import NamedTuple, Optional, Tuple
+from .enums import RuleType
+
+class StateSnapshot(NamedTuple):
+    """Immutable view of the game state published by the simulation for rendering"""
+    level: int
+    epoch: int
+    current_rule: Optional[RuleType]
+    base_grid: Tuple[Tuple[int, ...], ...]
+    changed_tiles: Tuple[Tuple[int, int, int], ...]
+    player_pos: Tuple[int, int]
+    door_pos: Tuple[int, int]
+    moves: int
+    max_moves: int
+    input_seq: int = 0
+    hint_cells: Tuple[Tuple[int, int], ...] = ()
+    best_moves: Optional[int] = None
+    leaderboard: Tuple[Tuple[int, int, float], ...] = ()
@@ -0,0 +1,354 @@
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import random
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from .constants import *
+from .enums import RULES
+from .save_game import NO_RULE, pack_tiles, unpack_tiles
+from .snapshot import StateSnapshot
+
+# Every message is a frame header followed by its payload
+FRAME = struct.Struct('<BH')
+KEYFRAME = 1
+DELTA = 2
+
+# level, epoch, rule, moves, max_moves, player, door, width, height, change count;
+# then the bit-packed base grid and every tile changed so far in the epoch
+KEYFRAME_HEADER = struct.Struct('<HIBHHBBBBBBH')
+# epoch, moves, player, door, new change count; then only the new tile changes
+DELTA_HEADER = struct.Struct('<IHBBBBB')
+TILE_CHANGE = struct.Struct('<BBB')
+
+
+def encode_keyframe(snapshot: StateSnapshot) -> bytes:
+    """Encode the full state of a snapshot"""
+    height = len(snapshot.base_grid)
+    width = len(snapshot.base_grid[0])
+    rule = RULES.index(snapshot.current_rule) if snapshot.current_rule in RULES else NO_RULE
+    payload = b''.join((
+        KEYFRAME_HEADER.pack(
+            snapshot.level, snapshot.epoch, rule, snapshot.moves, snapshot.max_moves,
+            snapshot.player_pos[0], snapshot.player_pos[1],
+            snapshot.door_pos[0], snapshot.door_pos[1],
+            width, height, len(snapshot.changed_tiles)
+        ),
+        pack_tiles(snapshot.base_grid),
+        b''.join(TILE_CHANGE.pack(*change) for change in snapshot.changed_tiles)
+    ))
+    return FRAME.pack(KEYFRAME, len(payload)) + payload
+
+
+def encode_delta(snapshot: StateSnapshot, synced_changes: int) -> bytes:
+    """Encode what changed in a snapshot since the first synced_changes tile changes"""
+    changes = snapshot.changed_tiles[synced_changes:]
+    payload = DELTA_HEADER.pack(
+        snapshot.epoch, snapshot.moves,
+        snapshot.player_pos[0], snapshot.player_pos[1],
+        snapshot.door_pos[0], snapshot.door_pos[1],
+        len(changes)
+    ) + b''.join(TILE_CHANGE.pack(*change) for change in changes)
+    return FRAME.pack(DELTA, len(payload)) + payload
+
+
+class SpectatorServer:
+    """Broadcasts a game session to spectators over TCP as keyframes and small deltas
+    
+    publish() only queues the snapshot; a broadcast thread encodes each update once and
+    sends the same bytes to every viewer. A delta carries the player, the door and the
+    tiles changed since the previous update, so its size follows the number of changes
+    rather than the grid. Keyframes go out for every new level epoch, every
+    keyframe_interval updates, and to each viewer when it joins.
+    """
+    
+    def __init__(self, host: str = SPECTATOR_HOST, port: int = SPECTATOR_PORT,
+                 keyframe_interval: int = SPECTATOR_KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.viewers = []
+        self.bytes_sent = 0
+        self.updates = 0
+        
+        self.listener = socket.create_server((host, port))
+        self.address = self.listener.getsockname()
+        
+        self._queue = deque()
+        self._joining = deque()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._last = None
+        self._since_keyframe = 0
+        
+        self._accept_thread = threading.Thread(target=self._accept, name="trium-spectator-accept", daemon=True)
+        self._broadcast_thread = threading.Thread(target=self._broadcast, name="trium-spectator", daemon=True)
+        self._accept_thread.start()
+        self._broadcast_thread.start()
+    
+    def publish(self, snapshot: StateSnapshot):
+        """Queue a snapshot to broadcast"""
+        self._queue.append(snapshot)
+        self._wakeup.set()
+    
+    def stop(self):
+        """Send what is queued, then disconnect every viewer"""
+        self._stopped = True
+        self._wakeup.set()
+        self.listener.close()
+        if threading.current_thread() is not self._broadcast_thread:
+            self._broadcast_thread.join()
+    
+    def _accept(self):
+        """Accept viewers until the listener is closed"""
+        while not self._stopped:
+            try:
+                connection, _ = self.listener.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection.settimeout(SPECTATOR_SEND_TIMEOUT_S)
+            self._joining.append(connection)
+            self._wakeup.set()
+    
+    def _broadcast(self):
+        """Broadcast loop: welcome new viewers and send every queued update"""
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            
+            while self._joining:
+                connection = self._joining.popleft()
+                if self._last is None or self._send(connection, encode_keyframe(self._last)):
+                    self.viewers.append(connection)
+            
+            while self._queue:
+                snapshot = self._queue.popleft()
+                data = self._encode(snapshot)
+                self._last = snapshot
+                self.updates += 1
+                self.viewers = [viewer for viewer in self.viewers if self._send(viewer, data)]
+            
+            if self._stopped:
+                for viewer in self.viewers + list(self._joining):
+                    viewer.close()
+                self.viewers = []
+                return
+    
+    def _encode(self, snapshot: StateSnapshot) -> bytes:
+        """Encode a snapshot as a delta against the last one, or as a keyframe"""
+        last = self._last
+        self._since_keyframe += 1
+        if (last is None or snapshot.epoch != last.epoch or snapshot.level != last.level
+                or snapshot.current_rule != last.current_rule
+                or self._since_keyframe >= self.keyframe_interval):
+            self._since_keyframe = 0
+            return encode_keyframe(snapshot)
+        return encode_delta(snapshot, len(last.changed_tiles))
+    
+    def _send(self, viewer: socket.socket, data: bytes) -> bool:
+        """Send bytes to a viewer, dropping the viewer if it has gone or fallen behind"""
+        try:
+            viewer.sendall(data)
+        except OSError:
+            viewer.close()
+            return False
+        self.bytes_sent += len(data)
+        return True
+
+
+class SpectatorClient:
+    """Receives a broadcast session and mirrors it as StateSnapshots for the Renderer"""
+    
+    def __init__(self, host: str = SPECTATOR_HOST, port: int = SPECTATOR_PORT, timeout: float = None):
+        self.connection = socket.create_connection((host, port), timeout=timeout)
+        self.snapshot = None
+        self.messages = 0
+        self.bytes_received = 0
+    
+    def receive(self) -> Optional[StateSnapshot]:
+        """Wait for the next update and return the mirrored snapshot, or None once disconnected"""
+        try:
+            header = self._read(FRAME.size)
+            if header is None:
+                return None
+            kind, length = FRAME.unpack(header)
+            payload = self._read(length)
+        except OSError:
+            return None
+        if payload is None:
+            return None
+        
+        self.messages += 1
+        self.bytes_received += FRAME.size + length
+        if kind == KEYFRAME:
+            self.snapshot = self._apply_keyframe(payload)
+        elif kind == DELTA and self.snapshot is not None:
+            self.snapshot = self._apply_delta(payload)
+        return self.snapshot
+    
+    def close(self):
+        """Disconnect from the broadcast"""
+        self.connection.close()
+    
+    def _apply_keyframe(self, payload: bytes) -> StateSnapshot:
+        """Replace the mirrored state with a keyframe"""
+        (level, epoch, rule, moves, max_moves, player_x, player_y, door_x, door_y,
+         width, height, change_count) = KEYFRAME_HEADER.unpack_from(payload)
+        offset = KEYFRAME_HEADER.size
+        tile_bytes = (width * height * TILE_BITS + 7) // 8
+        base_grid = tuple(tuple(row) for row in unpack_tiles(payload[offset:offset + tile_bytes], width, height))
+        offset += tile_bytes
+        changes = tuple(TILE_CHANGE.iter_unpack(payload[offset:offset + change_count * TILE_CHANGE.size]))
+        return StateSnapshot(
+            level, epoch, RULES[rule] if rule != NO_RULE else None,
+            base_grid, changes,
+            (player_x, player_y), (door_x, door_y),
+            moves, max_moves
+        )
+    
+    def _apply_delta(self, payload: bytes) -> StateSnapshot:
+        """Apply a delta to the mirrored state"""
+        epoch, moves, player_x, player_y, door_x, door_y, change_count = DELTA_HEADER.unpack_from(payload)
+        changes = self.snapshot.changed_tiles
+        if change_count:
+            changes += tuple(TILE_CHANGE.iter_unpack(payload[DELTA_HEADER.size:]))
+        return self.snapshot._replace(
+            epoch=epoch, changed_tiles=changes, moves=moves,
+            player_pos=(player_x, player_y), door_pos=(door_x, door_y)
+        )
+    
+    def _read(self, size: int) -> Optional[bytes]:
+        """Read exactly size bytes, or None if the connection closed"""
+        data = b''
+        while len(data) < size:
+            chunk = self.connection.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+
+def watch(host: str = SPECTATOR_HOST, port: int = SPECTATOR_PORT):
+    """Open a window that renders a broadcast session with the game's Renderer"""
+    import pygame
+    from .renderer import Renderer
+    
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Trium - Spectator")
+    renderer = Renderer(screen)
+    client = SpectatorClient(host, port)
+    
+    # Rendering happens on this thread; updates are mirrored on a reader thread
+    latest = [None]
+    
+    def read():
+        snapshot = client.receive()
+        while snapshot is not None:
+            latest[0] = snapshot
+            snapshot = client.receive()
+        latest.append(None)
+    
+    threading.Thread(target=read, name="trium-spectator-reader", daemon=True).start()
+    
+    clock = pygame.time.Clock()
+    drawn = None
+    while len(latest) == 1:
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            break
+        if latest[0] is not None and latest[0] is not drawn:
+            drawn = latest[0]
+            renderer.render_snapshot(drawn)
+        clock.tick(FPS)
+    
+    client.close()
+    pygame.quit()
+
+
+def run_swarm(host: str, port: int, viewers: int) -> List[SpectatorClient]:
+    """Connect a swarm of headless viewers that mirror the broadcast until it ends"""
+    clients = []
+    for index in range(viewers):
+        client = SpectatorClient(host, port)
+        client.thread = threading.Thread(target=_drain, args=(client,), name=f"trium-viewer-{index}", daemon=True)
+        client.thread.start()
+        clients.append(client)
+    return clients
+
+
+def _drain(client: SpectatorClient):
+    """Receive updates until the broadcast ends"""
+    while client.receive() is not None:
+        pass
+    client.close()
+
+
+def swarm_benchmark(viewers: int, moves: int, keyframe_interval: int = SPECTATOR_KEYFRAME_INTERVAL) -> Dict:
+    """Broadcast a random bot's session on localhost to a swarm and check every mirror"""
+    from .game_state import GameState
+    from .player import Player
+    
+    server = SpectatorServer(SPECTATOR_HOST, 0, keyframe_interval)
+    clients = run_swarm(server.address[0], server.address[1], viewers)
+    while len(server.viewers) < viewers:
+        time.sleep(0.01)
+    
+    game_state = GameState(campaign_seed=0, use_level_files=False)
+    game_state.generate_level()
+    player = Player()
+    directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    
+    start = time.perf_counter()
+    for _ in range(moves):
+        dx, dy = random.choice(directions)
+        player.move(dx, dy, game_state)
+        if game_state.is_level_complete() and game_state.level < MAX_LEVELS:
+            game_state.next_level()
+            player.reset()
+        elif game_state.is_level_complete() or game_state.is_game_over():
+            game_state.reset_level()
+            player.reset()
+        server.publish(game_state.snapshot())
+    server.stop()
+    for client in clients:
+        client.thread.join()
+    elapsed = time.perf_counter() - start
+    
+    # Every mirror must end up showing exactly the published state
+    final = game_state.snapshot()
+    return {
+        'viewers': viewers,
+        'updates': server.updates,
+        'in_sync': sum(1 for client in clients if client.snapshot == final),
+        'bytes_sent': server.bytes_sent,
+        'bytes_per_update': server.bytes_sent / max(1, server.updates * viewers),
+        'keyframe_bytes': len(encode_keyframe(final)),
+        'elapsed_s': elapsed
+    }
+
+
+def main():
+    """Watch a broadcast, or benchmark a local swarm of viewers"""
+    parser = argparse.ArgumentParser(description="Trium live spectator")
+    parser.add_argument('--host', default=SPECTATOR_HOST, help="broadcast host to watch")
+    parser.add_argument('--port', type=int, default=SPECTATOR_PORT, help="broadcast port to watch")
+    parser.add_argument('--swarm', type=int, default=0, help="benchmark this many headless viewers on localhost")
+    parser.add_argument('--moves', type=int, default=1000, help="bot moves to broadcast to the swarm")
+    args = parser.parse_args()
+    
+    if not args.swarm:
+        watch(args.host, args.port)
+        return
+    
+    report = swarm_benchmark(args.swarm, args.moves)
+    print(f"{report['updates']} updates to {report['viewers']} viewers in {report['elapsed_s']:.2f} s, "
+          f"{report['in_sync']} in sync, {report['bytes_per_update']:.1f} bytes per update per viewer "
+          f"(keyframe {report['keyframe_bytes']} bytes), {report['bytes_sent']:,} bytes sent")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,7 +26,9 @@ class Sprite:
         """Set the grid position of the sprite"""
         self.x = x
         self.y = y
-        self.rect = pygame.Rect(x * TILE_SIZE + GRID_X, y * TILE_SIZE + GRID_Y, self.size, self.size)
+        # Move the existing rect instead of allocating a new one
+        self.rect.x = x * TILE_SIZE + GRID_X
+        self.rect.y = y * TILE_SIZE + GRID_Y
     
     def get_type(self) -> str:
         """Get the sprite type"""
@@ -0,0 +1,108 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from .constants import *
+
+# Field names for the positional values recorded with each event
+EVENT_FIELDS = {
+    'level_start': ('level', 'rule'),
+    'move': ('level', 'x', 'y', 'moves'),
+    'teleport': ('level', 'x', 'y', 'to_x', 'to_y'),
+    'speed_boost': ('level', 'x', 'y'),
+    'red_tile_death': ('level', 'x', 'y', 'moves'),
+    'door_relocated': ('level', 'x', 'y', 'moves'),
+    'restart': ('level', 'moves', 'restarts'),
+    'level_complete': ('level', 'rule', 'moves', 'restarts', 'duration_s'),
+    'game_over': ('level', 'rule', 'moves', 'restarts', 'duration_s')
+}
+
+
+class NullTelemetry:
+    """Telemetry that records nothing, used by headless and look-ahead game states"""
+    
+    def record(self, event: str, *values):
+        pass
+    
+    def close(self):
+        pass
+
+
+NULL_TELEMETRY = NullTelemetry()
+
+
+class Telemetry:
+    """Buffers gameplay events in memory and appends them to a rotating NDJSON file
+    
+    record() only appends a tuple to a deque, which is safe without a lock under the
+    GIL; a background thread drains it in batches, formats the lines and rotates the
+    file once it grows past max_bytes. close() (also run at exit) writes what is left.
+    """
+    
+    def __init__(self, path: str = TELEMETRY_FILE, max_bytes: int = TELEMETRY_MAX_BYTES,
+                 backups: int = TELEMETRY_BACKUPS, flush_interval: float = TELEMETRY_FLUSH_INTERVAL_S):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.buffer = deque()
+        self.written = 0
+        
+        self._closed = False
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trium-telemetry", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def record(self, event: str, *values):
+        """Queue an event; values follow the field order in EVENT_FIELDS"""
+        self.buffer.append((time.time(), event, values))
+    
+    def close(self):
+        """Stop the writer thread and write every event still buffered"""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop_event.set()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join()
+        self._flush()
+    
+    def _run(self):
+        """Writer loop: flush a batch every interval until stopped"""
+        while not self._stop_event.wait(self.flush_interval):
+            self._flush()
+    
+    def _flush(self):
+        """Write the buffered events as one batch of NDJSON lines"""
+        lines = []
+        buffer = self.buffer
+        while buffer:
+            timestamp, event, values = buffer.popleft()
+            entry = {'time': round(timestamp, 6), 'event': event}
+            entry.update(zip(EVENT_FIELDS.get(event, ()), values))
+            lines.append(json.dumps(entry, default=lambda value: getattr(value, 'name', str(value))))
+        if not lines:
+            return
+        
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                self._rotate()
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write('\n'.join(lines) + '\n')
+            self.written += len(lines)
+        except OSError as e:
+            print(f"Error writing telemetry: {e}")
+    
+    def _rotate(self):
+        """Shift path -> path.1 -> path.2 ..., dropping the oldest backup"""
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
@@ -0,0 +1,175 @@
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Tuple
+from .constants import *
+from .game_state import GameState
+from .player import Player
+from .tracing import tracer
+
+# A policy maps an observation to the (dx, dy) of the key it presses
+Policy = Callable[[Dict], Tuple[int, int]]
+
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def random_policy(observation: Dict) -> Tuple[int, int]:
+    """Press a random direction key"""
+    return random.choice(DIRECTIONS)
+
+
+def greedy_policy(observation: Dict) -> Tuple[int, int]:
+    """Follow the distance-field hint, or press a random key when there is none"""
+    return observation['hint'] or random.choice(DIRECTIONS)
+
+
+def play_chunk(args) -> Tuple[List[Dict], List[Dict]]:
+    """Worker entry point: play a chunk of episodes, returning their results and trace events"""
+    policy, specs, max_steps, trace_sample_every = args
+    if trace_sample_every:
+        tracer.start(trace_sample_every)
+    results = [Tournament.run_episode(policy, spec, max_steps) for spec in specs]
+    tracer.stop()
+    return results, tracer.drain()
+
+
+class Tournament:
+    """Plays policies against a set of levels headlessly on a process pool"""
+    
+    def __init__(self, workers: int = None, max_steps: int = EPISODE_MAX_STEPS, trace_sample_every: int = 0):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_steps = max_steps
+        
+        # When non-zero, workers trace one in this many top-level spans and send them back
+        self.trace_sample_every = trace_sample_every
+        self.trace_events = []
+    
+    @staticmethod
+    def file_levels(levels_dir: str = "levels") -> List[Tuple]:
+        """Get level specs for every numbered level file that exists"""
+        specs = []
+        for level in range(1, MAX_LEVELS + 1):
+            if os.path.exists(os.path.join(levels_dir, f"level_{level}.txt")):
+                specs.append(('file', level))
+        return specs
+    
+    @staticmethod
+    def seeded_levels(seeds, levels=range(1, MAX_LEVELS + 1)) -> List[Tuple]:
+        """Get level specs for procedurally generated levels of the given campaign seeds"""
+        return [('seed', seed, level) for seed in seeds for level in levels]
+    
+    @staticmethod
+    def observe(game_state) -> Dict:
+        """Build the observation a policy sees"""
+        return {
+            'level': game_state.level,
+            'rule': game_state.current_rule,
+            'grid': game_state.grid,
+            'player_pos': tuple(game_state.player_pos),
+            'door_pos': tuple(game_state.door_pos),
+            'moves': game_state.moves,
+            'max_moves': game_state.max_moves,
+            'hint': game_state.get_hint_direction()
+        }
+    
+    @staticmethod
+    def run_episode(policy: Policy, spec: Tuple, max_steps: int = EPISODE_MAX_STEPS) -> Dict:
+        """Play one level headlessly with a policy and return its outcome"""
+        if spec[0] == 'file':
+            game_state = GameState()
+            game_state.level = spec[1]
+        else:
+            game_state = GameState(campaign_seed=spec[1], use_level_files=False)
+            game_state.level = spec[2]
+        game_state.generate_level()
+        player = Player()
+        
+        steps = 0
+        while steps < max_steps and not game_state.is_level_complete() and not game_state.is_game_over():
+            dx, dy = policy(Tournament.observe(game_state))
+            if game_state.reverse_controls:
+                dx, dy = -dx, -dy
+            player.move(dx, dy, game_state)
+            steps += 1
+        
+        return {
+            'spec': spec,
+            'won': game_state.is_level_complete(),
+            'moves': game_state.moves,
+            'restarts': game_state.restarts,
+            'steps': steps
+        }
+    
+    def run(self, policies: Dict[str, Policy], specs: List[Tuple], episodes_per_level: int = 1) -> Dict[str, Dict]:
+        """Play every policy on every level across the process pool and report per policy"""
+        episodes = [spec for spec in specs for _ in range(episodes_per_level)]
+        chunk_size = max(1, len(episodes) // (self.workers * 4))
+        chunks = [episodes[i:i + chunk_size] for i in range(0, len(episodes), chunk_size)]
+        
+        reports = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for name, policy in policies.items():
+                start = time.perf_counter()
+                results = []
+                jobs = [(policy, chunk, self.max_steps, self.trace_sample_every) for chunk in chunks]
+                for chunk_results, events in executor.map(play_chunk, jobs):
+                    results.extend(chunk_results)
+                    self.trace_events.extend(events)
+                reports[name] = self._summarise(results, time.perf_counter() - start)
+        return reports
+    
+    def _summarise(self, results: List[Dict], elapsed: float) -> Dict:
+        """Aggregate episode outcomes into a policy report"""
+        episodes = len(results)
+        wins = [result for result in results if result['won']]
+        steps = sum(result['steps'] for result in results)
+        return {
+            'episodes': episodes,
+            'wins': len(wins),
+            'win_rate': len(wins) / episodes if episodes else 0.0,
+            'mean_moves_to_win': sum(result['moves'] for result in wins) / len(wins) if wins else 0.0,
+            'mean_move_budget_used': (sum(result['moves'] for result in results) / (episodes * MAX_MOVES)
+                                      if episodes else 0.0),
+            'restarts': sum(result['restarts'] for result in results),
+            'steps': steps,
+            'elapsed_s': elapsed,
+            'steps_per_second': steps / elapsed if elapsed > 0 else 0.0
+        }
+
+
+def main():
+    """Run the built-in policies from the command line"""
+    parser = argparse.ArgumentParser(description="Headless Trium bot tournament")
+    parser.add_argument('--seeds', type=int, default=50, help="number of generated campaigns to add")
+    parser.add_argument('--episodes', type=int, default=1, help="episodes per level")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--max-steps', type=int, default=EPISODE_MAX_STEPS, help="key presses per episode")
+    parser.add_argument('--trace', nargs='?', const=TRACE_FILE, default=None,
+                        help=f"write a Chrome trace of the run (default file: {TRACE_FILE})")
+    parser.add_argument('--trace-sample', type=int, default=TRACE_SAMPLE_EVERY,
+                        help="trace one in this many top-level spans")
+    args = parser.parse_args()
+    
+    specs = Tournament.file_levels() + Tournament.seeded_levels(range(args.seeds))
+    policies = {'random': random_policy, 'greedy': greedy_policy}
+    tournament = Tournament(args.workers, args.max_steps, args.trace_sample if args.trace else 0)
+    reports = tournament.run(policies, specs, args.episodes)
+    
+    for name, report in reports.items():
+        print(f"{name}: win rate {report['win_rate']:.1%} over {report['episodes']} episodes, "
+              f"{report['mean_moves_to_win']:.1f} moves per win "
+              f"({report['mean_move_budget_used']:.1%} of {MAX_MOVES} used on average), "
+              f"{report['restarts']} red tile restarts, "
+              f"{report['steps_per_second']:,.0f} steps/s")
+    
+    if args.trace:
+        tracer.export(args.trace, tournament.trace_events)
+        print(f"Wrote {len(tournament.trace_events):,} trace events to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+from .constants import *
+
+
+class Span:
+    """Times one traced region; nested spans follow the sampling decision of their root"""
+    
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start', 'depth')
+    
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Dict = None):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+    
+    def __enter__(self):
+        local = self.tracer._local
+        self.depth = getattr(local, 'depth', 0)
+        if self.depth == 0:
+            self.tracer._roots += 1
+            local.sampled = self.tracer._roots % self.tracer.sample_every == 0
+        local.depth = self.depth + 1
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        local = self.tracer._local
+        local.depth = self.depth
+        if local.sampled:
+            event = {
+                'name': self.name, 'cat': self.category, 'ph': 'X',
+                'ts': self.start / 1000, 'dur': (end - self.start) / 1000,
+                'pid': self.tracer.pid, 'tid': threading.get_native_id()
+            }
+            if self.args:
+                event['args'] = self.args
+            self.tracer.events.append(event)
+        return False
+
+
+class NullSpan:
+    """Stand-in span handed out while tracing is off; it records nothing"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer:
+    """Collects sampled spans as Chrome trace events (viewable in Perfetto or chrome://tracing)
+    
+    Tracing is off until start() is called, and then one in sample_every top-level spans
+    is recorded together with everything nested inside it. Timestamps come from the
+    monotonic clock, so events drained from several worker processes can be merged.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.sample_every = 1
+        self.events = []
+        self.pid = os.getpid()
+        self._roots = 0
+        self._local = threading.local()
+    
+    def start(self, sample_every: int = TRACE_SAMPLE_EVERY):
+        """Start recording, clearing any earlier events"""
+        self.sample_every = max(1, sample_every)
+        self.events = []
+        self.pid = os.getpid()
+        self._roots = 0
+        self.enabled = True
+    
+    def stop(self):
+        """Stop recording"""
+        self.enabled = False
+    
+    def span(self, name: str, category: str = "trium", **args):
+        """Get a context manager that records the region it wraps while tracing is on"""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+    
+    def drain(self) -> List[Dict]:
+        """Take the recorded events, e.g. to send them back from a worker process"""
+        events, self.events = self.events, []
+        return events
+    
+    def export(self, path: str, events: List[Dict] = None):
+        """Write events (by default this process's own) as a Chrome trace JSON file"""
+        events = self.events if events is None else events
+        metadata = [
+            {'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': f"trium {pid}"}}
+            for pid in sorted({event['pid'] for event in events})
+        ]
+        try:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, file)
+        except OSError as e:
+            print(f"Error writing trace: {e}")
+
+
+tracer = Tracer()
+
+
+def traced(name: str = None, category: str = "trium"):
+    """Decorate a function so each call is a span while tracing is on"""
+    def decorate(func):
+        label = name or func.__qualname__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            
+            # Inside a root that was not sampled there is nothing to record
+            local = tracer._local
+            if getattr(local, 'depth', 0) and not local.sampled:
+                return func(*args, **kwargs)
+            with Span(tracer, label, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate